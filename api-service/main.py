@@ -1,7 +1,9 @@
 from fastapi import FastAPI, APIRouter
 import logging
 import threading
+import time
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -30,15 +32,28 @@ logger = logging.getLogger(__name__)
 
 limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
 
-app = FastAPI(title="MIST API", version="1.0.0")
+# orjson encodes response bodies in C and handles datetime/UUID natively.
+app = FastAPI(title="MIST API", version="1.0.0", default_response_class=ORJSONResponse)
+
+
+DB_INIT_ATTEMPTS = 8
 
 
 def _initialize_database() -> None:
-    try:
-        create_tables()
-        logger.info("Database tables ready")
-    except Exception:
-        logger.exception("Database initialization failed; API will start and retry on next deploy/restart")
+    # The database may still be starting alongside the API; retry on the shared
+    # engine with exponential backoff (1 s, 2 s, ... capped at 30 s).
+    for attempt in range(DB_INIT_ATTEMPTS):
+        try:
+            create_tables()
+            logger.info("Database tables ready")
+            return
+        except Exception:
+            if attempt == DB_INIT_ATTEMPTS - 1:
+                logger.exception("Database initialization failed; API will start and retry on next deploy/restart")
+                return
+            delay = min(2 ** attempt, 30)
+            logger.warning("Database not ready (attempt %s/%s); retrying in %ss", attempt + 1, DB_INIT_ATTEMPTS, delay)
+            time.sleep(delay)
 
 @app.on_event("startup")
 async def on_startup():
@@ -1,5 +1,6 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 import logging
@@ -44,9 +45,11 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 return self._unauthorized("Invalid or expired token")
 
             try:
-                user = UserRepository.get_by_id(UUID(token_data.user_id))
+                user_id = UUID(token_data.user_id)
             except ValueError:
                 return self._unauthorized("Invalid token subject")
+            # Keep the blocking DB lookup off the event loop.
+            user = await run_in_threadpool(UserRepository.get_by_id, user_id)
             if user is None:
                 return self._unauthorized("User not found")
 
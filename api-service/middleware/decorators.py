@@ -1,29 +1,44 @@
+import inspect
 from functools import wraps
 from fastapi import Request, HTTPException, status
 from typing import Callable
 from shared.db.models.user import UserRole
 
 
-def require_auth(func: Callable) -> Callable:
+def _guard(func: Callable, check: Callable) -> Callable:
+    # Plain `def` routes keep a sync wrapper so FastAPI still runs them in its
+    # threadpool instead of on the event loop.
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            check(kwargs.get('request') or args[0])
+            return await func(*args, **kwargs)
+        return async_wrapper
+
     @wraps(func)
-    async def wrapper(*args, **kwargs):
-        request = kwargs.get('request') or args[0]
-        if not hasattr(request.state, 'user'):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
-        return await func(*args, **kwargs)
+    def wrapper(*args, **kwargs):
+        check(kwargs.get('request') or args[0])
+        return func(*args, **kwargs)
     return wrapper
 
 
+def _check_auth(request: Request):
+    if not hasattr(request.state, 'user'):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+
+
+def _check_admin(request: Request):
+    _check_auth(request)
+    if request.state.user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+
+
+def require_auth(func: Callable) -> Callable:
+    return _guard(func, _check_auth)
+
+
 def require_admin(func: Callable) -> Callable:
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        request = kwargs.get('request') or args[0]
-        if not hasattr(request.state, 'user'):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
-        if request.state.user.role != UserRole.ADMIN:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
-        return await func(*args, **kwargs)
-    return wrapper
+    return _guard(func, _check_admin)
 
 
 def get_current_user_from_request(request: Request):
@@ -85,7 +85,7 @@ def register(request: Request, req: RegisterRequest):
         if len(req.password) < 8:
             raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
 
-        if UserRepository.get_by_email(email):
+        if UserRepository.email_exists(email):
             raise HTTPException(status_code=400, detail="Email already registered")
 
         user_id = UserRepository.create_user(UserCreate(
@@ -93,6 +93,9 @@ def register(request: Request, req: RegisterRequest):
             username=username,
             password=req.password,
         ))
+        if user_id is None:
+            # Lost a race with a concurrent registration for the same email.
+            raise HTTPException(status_code=400, detail="Email already registered")
         user = UserRepository.get_by_id(UUID(str(user_id)))
         if not user:
             raise HTTPException(status_code=500, detail="Failed to load created user")
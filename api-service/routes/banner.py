@@ -4,6 +4,7 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Form
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from shared.db.controllers.banner_controller import BannerRepository
 from services.s3_service import upload_banner_image, delete_banner_image, generate_presigned_read_url
@@ -28,7 +29,7 @@ def _serialize_banner(banner):
 
 
 @router.get("")
-async def get_active_banners():
+def get_active_banners():
     """Return all active banners ordered by display_order. Public endpoint."""
     try:
         banners = BannerRepository.get_active()
@@ -40,7 +41,7 @@ async def get_active_banners():
 
 @router.get("/all")
 @require_admin
-async def get_all_banners(request: Request):
+def get_all_banners(request: Request):
     """Return all banners (active + inactive). Admin only."""
     try:
         banners = BannerRepository.get_all()
@@ -73,13 +74,13 @@ async def create_banner(
     image_key = f"banners/{uuid.uuid4()}/{uuid.uuid4()}.{ext}"
 
     try:
-        image_url = upload_banner_image(file_bytes, image_key, image.content_type)
+        image_url = await run_in_threadpool(upload_banner_image, file_bytes, image_key, image.content_type)
     except Exception as e:
         logger.error(f"S3 upload failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload image to storage.")
 
     try:
-        banner_id = BannerRepository.create({
+        banner_id = await run_in_threadpool(BannerRepository.create, {
             "title": title,
             "subtitle": subtitle,
             "image_url": image_url,
@@ -88,12 +89,12 @@ async def create_banner(
             "display_order": display_order,
             "is_active": is_active,
         })
-        banner = BannerRepository.get_by_id(banner_id)
+        banner = await run_in_threadpool(BannerRepository.get_by_id, banner_id)
         return {"success": True, "banner": _serialize_banner(banner)}
     except Exception as e:
         # Attempt S3 cleanup on DB failure
         try:
-            delete_banner_image(image_key)
+            await run_in_threadpool(delete_banner_image, image_key)
         except Exception:
             pass
         logger.error(f"Error creating banner record: {e}")
@@ -110,7 +111,7 @@ class UpdateBannerRequest(BaseModel):
 
 @router.put("/{banner_id}")
 @require_admin
-async def update_banner(banner_id: int, req: UpdateBannerRequest, request: Request):
+def update_banner(banner_id: int, req: UpdateBannerRequest, request: Request):
     """Update banner metadata. Admin only."""
     try:
         if not BannerRepository.get_by_id(banner_id):
@@ -136,7 +137,7 @@ async def replace_banner_image(
     image: UploadFile = File(...),
 ):
     """Replace the image of an existing banner. Admin only."""
-    existing = BannerRepository.get_by_id(banner_id)
+    existing = await run_in_threadpool(BannerRepository.get_by_id, banner_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Banner not found")
 
@@ -151,27 +152,27 @@ async def replace_banner_image(
     new_key = f"banners/{uuid.uuid4()}/{uuid.uuid4()}.{ext}"
 
     try:
-        new_url = upload_banner_image(file_bytes, new_key, image.content_type)
+        new_url = await run_in_threadpool(upload_banner_image, file_bytes, new_key, image.content_type)
     except Exception as e:
         logger.error(f"S3 upload failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload image to storage.")
 
     old_key = existing.image_key
-    BannerRepository.update(banner_id, {"image_url": new_url, "image_key": new_key})
+    await run_in_threadpool(BannerRepository.update, banner_id, {"image_url": new_url, "image_key": new_key})
 
     if old_key:
         try:
-            delete_banner_image(old_key)
+            await run_in_threadpool(delete_banner_image, old_key)
         except Exception as e:
             logger.warning(f"Could not delete old banner image {old_key}: {e}")
 
-    banner = BannerRepository.get_by_id(banner_id)
+    banner = await run_in_threadpool(BannerRepository.get_by_id, banner_id)
     return {"success": True, "banner": _serialize_banner(banner)}
 
 
 @router.delete("/{banner_id}")
 @require_admin
-async def delete_banner(banner_id: int, request: Request):
+def delete_banner(banner_id: int, request: Request):
     """Delete banner record and its S3 image. Admin only."""
     try:
         if not BannerRepository.get_by_id(banner_id):
@@ -22,7 +22,7 @@ class UpdateCurationRequest(BaseModel):
 
 
 @router.get("/top-picks")
-async def get_top_picks(active_only: bool = Query(default=True)):
+def get_top_picks(active_only: bool = Query(default=True)):
     try:
         rows = AdminCuratedTrackRepository.get_all(active_only=active_only)
         return {"success": True, "count": len(rows), "tracks": rows}
@@ -33,7 +33,7 @@ async def get_top_picks(active_only: bool = Query(default=True)):
 
 @router.post("/top-picks")
 @require_admin
-async def add_top_pick(req: UpsertCurationRequest, request: Request):
+def add_top_pick(req: UpsertCurationRequest, request: Request):
     try:
         track = TrackRepository.get_by_id(req.track_id)
         if not track:
@@ -53,7 +53,7 @@ async def add_top_pick(req: UpsertCurationRequest, request: Request):
 
 @router.put("/top-picks/{track_id}")
 @require_admin
-async def update_top_pick(track_id: int, req: UpdateCurationRequest, request: Request):
+def update_top_pick(track_id: int, req: UpdateCurationRequest, request: Request):
     try:
         if not TrackRepository.get_by_id(track_id):
             raise HTTPException(status_code=404, detail="Track not found")
@@ -72,7 +72,7 @@ async def update_top_pick(track_id: int, req: UpdateCurationRequest, request: Re
 
 @router.delete("/top-picks/{track_id}")
 @require_admin
-async def delete_top_pick(track_id: int, request: Request):
+def delete_top_pick(track_id: int, request: Request):
     try:
         deleted = AdminCuratedTrackRepository.remove(track_id)
         if not deleted:
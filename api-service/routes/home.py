@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Query
 import logging
 from urllib.parse import urlparse, unquote
 
+from shared.db.database import get_db_session
 from shared.db.controllers.analytics_controller import AnalyticsRepository
 from shared.db.controllers.playlist_controller import PlaylistRepository
 from services.s3_service import generate_hls_stream_url, generate_object_public_url, generate_presigned_read_url
@@ -65,11 +66,16 @@ def _normalize_popular_playlists(entries: list[dict]) -> list[dict]:
 
 
 @router.get("/sections")
-async def get_home_sections(limit: int = Query(default=10, ge=1, le=50)):
+def get_home_sections(limit: int = Query(default=10, ge=1, le=50)):
     try:
-        popular_songs = [_normalize_track(track) for track in AnalyticsRepository.get_featured_home_tracks(limit)]
-        most_listened = [_normalize_track(track) for track in AnalyticsRepository.get_most_listened_tracks(limit)]
-        top_pick = _normalize_top_pick(AnalyticsRepository.get_admin_top_picks(limit))
+        with get_db_session() as session:
+            featured = AnalyticsRepository.get_featured_home_tracks(limit, session=session)
+            most_listened_rows = AnalyticsRepository.get_most_listened_tracks(limit, session=session)
+            top_pick_rows = AnalyticsRepository.get_admin_top_picks(limit, session=session)
+
+        popular_songs = [_normalize_track(track) for track in featured]
+        most_listened = [_normalize_track(track) for track in most_listened_rows]
+        top_pick = _normalize_top_pick(top_pick_rows)
         popular_playlists = _normalize_popular_playlists(PlaylistRepository.get_public_popular_playlists(limit))
 
         return {
@@ -87,7 +93,7 @@ async def get_home_sections(limit: int = Query(default=10, ge=1, le=50)):
 
 
 @router.get("/popular")
-async def get_home_popular(limit: int = Query(default=10, ge=1, le=50)):
+def get_home_popular(limit: int = Query(default=10, ge=1, le=50)):
     try:
         tracks = [_normalize_track(track) for track in AnalyticsRepository.get_featured_home_tracks(limit)]
         return {"success": True, "count": len(tracks), "tracks": tracks}
@@ -97,7 +103,7 @@ async def get_home_popular(limit: int = Query(default=10, ge=1, le=50)):
 
 
 @router.get("/most-listened")
-async def get_home_most_listened(limit: int = Query(default=10, ge=1, le=50)):
+def get_home_most_listened(limit: int = Query(default=10, ge=1, le=50)):
     try:
         tracks = [_normalize_track(track) for track in AnalyticsRepository.get_most_listened_tracks(limit)]
         return {"success": True, "count": len(tracks), "tracks": tracks}
@@ -107,7 +113,7 @@ async def get_home_most_listened(limit: int = Query(default=10, ge=1, le=50)):
 
 
 @router.get("/top-pick")
-async def get_home_top_pick(limit: int = Query(default=10, ge=1, le=50)):
+def get_home_top_pick(limit: int = Query(default=10, ge=1, le=50)):
     try:
         picks = _normalize_top_pick(AnalyticsRepository.get_admin_top_picks(limit))
         return {"success": True, "count": len(picks), "tracks": picks}
@@ -117,7 +123,7 @@ async def get_home_top_pick(limit: int = Query(default=10, ge=1, le=50)):
 
 
 @router.get("/popular-playlists")
-async def get_home_popular_playlists(limit: int = Query(default=10, ge=1, le=50)):
+def get_home_popular_playlists(limit: int = Query(default=10, ge=1, le=50)):
     try:
         playlists = _normalize_popular_playlists(PlaylistRepository.get_public_popular_playlists(limit))
         return {"success": True, "count": len(playlists), "playlists": playlists}
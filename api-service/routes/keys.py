@@ -26,19 +26,17 @@ async def keys_options(track_id: int, request: Request):
 
 
 @router.get('/{track_id}')
-async def get_key(track_id: int, request: Request):
+def get_key(track_id: int, request: Request):
     if not hasattr(request.state, 'user'):
         raise HTTPException(status_code=401, detail="Authentication required")
 
     try:
         cors_origin = settings.get_key_cors_origin(request.headers.get("origin"))
 
-        key_record = TrackEncryptionKeysRepository.get_by_track_id(track_id)
-        if not key_record:
+        key_bytes = TrackEncryptionKeysRepository.get_key_bytes(track_id)
+        if key_bytes is None:
             raise HTTPException(status_code=404, detail="Key not found")
-
-        key_bytes = key_record.get_key_bytes()
-        if not key_bytes or len(key_bytes) != 16:
+        if len(key_bytes) != 16:
             raise HTTPException(status_code=500, detail="Invalid encryption key")
 
         return Response(
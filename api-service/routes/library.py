@@ -65,7 +65,7 @@ class UpdatePlaylistRequest(BaseModel):
 
 
 @router.post("/likes/{track_id}")
-async def like_track(track_id: int, request: Request):
+def like_track(track_id: int, request: Request):
     try:
         user_id = _require_user_uuid(request)
         if not TrackRepository.get_by_id(track_id):
@@ -80,7 +80,7 @@ async def like_track(track_id: int, request: Request):
 
 
 @router.delete("/likes/{track_id}")
-async def unlike_track(track_id: int, request: Request):
+def unlike_track(track_id: int, request: Request):
     try:
         user_id = _require_user_uuid(request)
         deleted = TrackLikeRepository.unlike_track(user_id, track_id)
@@ -93,7 +93,7 @@ async def unlike_track(track_id: int, request: Request):
 
 
 @router.get("/likes")
-async def get_likes(
+def get_likes(
     request: Request,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
@@ -110,7 +110,7 @@ async def get_likes(
 
 
 @router.get("/likes/{track_id}/status")
-async def get_like_status(track_id: int, request: Request):
+def get_like_status(track_id: int, request: Request):
     try:
         user_id = _require_user_uuid(request)
         liked = TrackLikeRepository.is_liked(user_id, track_id)
@@ -123,7 +123,7 @@ async def get_like_status(track_id: int, request: Request):
 
 
 @router.get("/feed")
-async def get_personalized_feed(
+def get_personalized_feed(
     request: Request,
     limit: int = Query(default=24, ge=1, le=100),
 ):
@@ -275,7 +275,7 @@ async def get_personalized_feed(
 
 
 @router.post("/playlists")
-async def create_playlist(req: CreatePlaylistRequest, request: Request):
+def create_playlist(req: CreatePlaylistRequest, request: Request):
     try:
         user_id = _require_user_uuid(request)
         playlist = PlaylistRepository.create(
@@ -293,7 +293,7 @@ async def create_playlist(req: CreatePlaylistRequest, request: Request):
 
 
 @router.get("/playlists")
-async def get_my_playlists(request: Request):
+def get_my_playlists(request: Request):
     try:
         user_id = _require_user_uuid(request)
         playlists = PlaylistRepository.get_user_playlists(user_id)
@@ -306,7 +306,7 @@ async def get_my_playlists(request: Request):
 
 
 @router.get("/playlists/{playlist_id}")
-async def get_playlist(playlist_id: UUID, request: Request):
+def get_playlist(playlist_id: UUID, request: Request):
     try:
         playlist = PlaylistRepository.get_by_id(playlist_id)
         if not playlist:
@@ -334,7 +334,7 @@ async def get_playlist(playlist_id: UUID, request: Request):
 
 
 @router.put("/playlists/{playlist_id}")
-async def update_playlist(playlist_id: UUID, req: UpdatePlaylistRequest, request: Request):
+def update_playlist(playlist_id: UUID, req: UpdatePlaylistRequest, request: Request):
     try:
         user_id = _require_user_uuid(request)
         update_data = req.model_dump(exclude_unset=True)
@@ -354,7 +354,7 @@ async def update_playlist(playlist_id: UUID, req: UpdatePlaylistRequest, request
 
 
 @router.delete("/playlists/{playlist_id}")
-async def delete_playlist(playlist_id: UUID, request: Request):
+def delete_playlist(playlist_id: UUID, request: Request):
     try:
         user_id = _require_user_uuid(request)
         deleted = PlaylistRepository.delete(playlist_id, user_id)
@@ -369,7 +369,7 @@ async def delete_playlist(playlist_id: UUID, request: Request):
 
 
 @router.post("/playlists/{playlist_id}/tracks/{track_id}")
-async def add_track_to_playlist(playlist_id: UUID, track_id: int, request: Request):
+def add_track_to_playlist(playlist_id: UUID, track_id: int, request: Request):
     try:
         user_id = _require_user_uuid(request)
         if not TrackRepository.get_by_id(track_id):
@@ -387,7 +387,7 @@ async def add_track_to_playlist(playlist_id: UUID, track_id: int, request: Reque
 
 
 @router.delete("/playlists/{playlist_id}/tracks/{track_id}")
-async def remove_track_from_playlist(playlist_id: UUID, track_id: int, request: Request):
+def remove_track_from_playlist(playlist_id: UUID, track_id: int, request: Request):
     try:
         user_id = _require_user_uuid(request)
         removed = PlaylistTrackRepository.remove_track(playlist_id, user_id, track_id)
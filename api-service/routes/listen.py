@@ -26,7 +26,7 @@ class ListenCompleteRequest(BaseModel):
 
 
 @router.post("/start")
-async def start_listening(req: ListenStartRequest, request: Request):
+def start_listening(req: ListenStartRequest, request: Request):
     try:
         if not hasattr(request.state, 'user'):
             raise HTTPException(status_code=401, detail="Authentication required")
@@ -48,7 +48,6 @@ async def start_listening(req: ListenStartRequest, request: Request):
             })
 
         session_id = ListeningService.start_listening_session(user_id, req.track_id, ip_address)
-        ListeningService.increment_track_started(user_id, ip_address)
         TrackRepository.increment_play_metrics(req.track_id, listens_increment=1, feature_score_increment=1)
 
         return {"success": True, "session_id": session_id, "track_id": req.track_id, "quota": quota_info}
@@ -61,7 +60,7 @@ async def start_listening(req: ListenStartRequest, request: Request):
 
 
 @router.post("/heartbeat")
-async def listening_heartbeat(req: ListenHeartbeatRequest, request: Request):
+def listening_heartbeat(req: ListenHeartbeatRequest, request: Request):
     try:
         if not hasattr(request.state, 'user'):
             raise HTTPException(status_code=401, detail="Authentication required")
@@ -84,7 +83,7 @@ async def listening_heartbeat(req: ListenHeartbeatRequest, request: Request):
 
 
 @router.post("/complete")
-async def complete_listening(req: ListenCompleteRequest, request: Request):
+def complete_listening(req: ListenCompleteRequest, request: Request):
     try:
         if not hasattr(request.state, 'user'):
             raise HTTPException(status_code=401, detail="Authentication required")
@@ -107,7 +106,7 @@ async def complete_listening(req: ListenCompleteRequest, request: Request):
 
 
 @router.get("/quota")
-async def get_quota_status(request: Request):
+def get_quota_status(request: Request):
     try:
         if not hasattr(request.state, 'user'):
             raise HTTPException(status_code=401, detail="Authentication required")
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, File
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 import os
 import logging
@@ -30,7 +31,8 @@ MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
 
 
 def _serialize_track(track):
-    payload = track.to_dict()
+    # List endpoints already hand back serialised rows; single-track lookups return models.
+    payload = dict(track) if isinstance(track, dict) else track.to_dict()
 
     cover_key = payload.get("cover_image_key")
     if not cover_key:
@@ -46,31 +48,39 @@ def _serialize_track(track):
         except Exception:
             payload["cover_image_url"] = generate_object_public_url(cover_key)
 
-    payload["cdn_url"] = generate_hls_stream_url(track.track_id)
+    payload["cdn_url"] = generate_hls_stream_url(payload["track_id"])
     return payload
 
 
 @router.get("")
-async def get_tracks(
+def get_tracks(
     limit: int = Query(default=20, ge=1, le=100),
     skip: int = Query(default=0, ge=0),
     offset: int = Query(default=0, ge=0),
+    after_id: Optional[int] = Query(default=None, ge=0),
     genre: Optional[str] = Query(default=None)
 ):
     actual_offset = skip if skip > 0 else offset
     try:
         if genre:
-            tracks = TrackRepository.filter_by_genre(genre, limit, actual_offset)
+            tracks = TrackRepository.filter_by_genre(genre, limit, actual_offset, after_id=after_id)
         else:
-            tracks = TrackRepository.get_all(limit, actual_offset)
-        return {"success": True, "count": len(tracks), "tracks": [_serialize_track(t) for t in tracks]}
+            tracks = TrackRepository.get_all(limit, actual_offset, after_id=after_id)
+        # Pass next_cursor back as after_id to fetch the following page without an OFFSET scan.
+        next_cursor = tracks[-1]["track_id"] if len(tracks) == limit else None
+        return {
+            "success": True,
+            "count": len(tracks),
+            "tracks": [_serialize_track(t) for t in tracks],
+            "next_cursor": next_cursor,
+        }
     except Exception as e:
         logger.error(f"Error fetching tracks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/search")
-async def search_tracks(
+def search_tracks(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=10, ge=1, le=100)
 ):
@@ -83,7 +93,7 @@ async def search_tracks(
 
 
 @router.get("/popular")
-async def get_popular_tracks(limit: int = Query(default=10, ge=1, le=50)):
+def get_popular_tracks(limit: int = Query(default=10, ge=1, le=50)):
     try:
         popular = AnalyticsRepository.get_popular_tracks(limit)
         return {"success": True, "count": len(popular), "tracks": popular}
@@ -93,7 +103,7 @@ async def get_popular_tracks(limit: int = Query(default=10, ge=1, le=50)):
 
 
 @router.get("/{track_id}")
-async def get_track_by_id(track_id: int):
+def get_track_by_id(track_id: int):
     try:
         track = TrackRepository.get_by_id(track_id)
         if not track:
@@ -107,7 +117,7 @@ async def get_track_by_id(track_id: int):
 
 
 @router.get("/{track_id}/stream")
-async def get_stream_info(track_id: int, request: Request):
+def get_stream_info(track_id: int, request: Request):
     try:
         if not hasattr(request.state, 'user'):
             raise HTTPException(status_code=401, detail="Authentication required")
@@ -148,7 +158,7 @@ async def get_stream_info(track_id: int, request: Request):
 
 
 @router.get("/{track_id}/similar")
-async def get_similar_tracks(track_id: int, limit: int = Query(default=10, ge=1, le=50)):
+def get_similar_tracks(track_id: int, limit: int = Query(default=10, ge=1, le=50)):
     try:
         track = TrackRepository.get_by_id(track_id)
         if not track:
@@ -181,7 +191,7 @@ class UpdateTrackRequest(BaseModel):
 
 @router.put("/{track_id}")
 @require_admin
-async def update_track(track_id: int, req: UpdateTrackRequest, request: Request):
+def update_track(track_id: int, req: UpdateTrackRequest, request: Request):
     try:
         if not TrackRepository.get_by_id(track_id):
             raise HTTPException(status_code=404, detail="Track not found")
@@ -200,7 +210,7 @@ async def update_track(track_id: int, req: UpdateTrackRequest, request: Request)
 
 @router.delete("/{track_id}")
 @require_admin
-async def delete_track(track_id: int, request: Request):
+def delete_track(track_id: int, request: Request):
     try:
         track = TrackRepository.get_by_id(track_id)
         if not track:
@@ -227,7 +237,7 @@ async def delete_track(track_id: int, request: Request):
 @require_admin
 async def upload_track_cover(track_id: int, request: Request, image: UploadFile = File(...)):
     try:
-        track = TrackRepository.get_by_id(track_id)
+        track = await run_in_threadpool(TrackRepository.get_by_id, track_id)
         if not track:
             raise HTTPException(status_code=404, detail="Track not found")
 
@@ -240,21 +250,21 @@ async def upload_track_cover(track_id: int, request: Request, image: UploadFile
 
         ext = image.filename.rsplit('.', 1)[-1].lower() if image.filename and '.' in image.filename else 'jpg'
         image_key = f"tracks/covers/{track_id}/{uuid.uuid4()}.{ext}"
-        image_url = upload_track_cover_image(file_bytes, image_key, image.content_type)
+        image_url = await run_in_threadpool(upload_track_cover_image, file_bytes, image_key, image.content_type)
 
         old_key = track.cover_image_key
-        TrackRepository.update(track_id, {
+        await run_in_threadpool(TrackRepository.update, track_id, {
             "cover_image_url": image_url,
             "cover_image_key": image_key,
         })
 
         if old_key:
             try:
-                delete_track_cover_image(old_key)
+                await run_in_threadpool(delete_track_cover_image, old_key)
             except Exception as e:
                 logger.warning(f"Could not delete old track cover image {old_key}: {e}")
 
-        updated = TrackRepository.get_by_id(track_id)
+        updated = await run_in_threadpool(TrackRepository.get_by_id, track_id)
         return {"success": True, "track": _serialize_track(updated) if updated else None}
     except HTTPException:
         raise
@@ -1,13 +1,87 @@
+import atexit
+import logging
+import threading
+import time
 from typing import Optional, Dict
 from shared.db.controllers.listening_history_controller import ListeningHistoryRepository, DailyQuotaRepository
 from shared.db.models.user import User, UserRole
 
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_FLUSH_INTERVAL = 10.0
+
 
 class QuotaLimits:
     FREE_DAILY_MINUTES = 5
     PREMIUM_DAILY_MINUTES = float('inf')
 
 
+class _HeartbeatBuffer:
+    """Coalesce heartbeat durations per session into one UPDATE per flush interval.
+
+    The first heartbeat of a session, and the first after each interval, is
+    written straight through (so an unknown session is still reported); later
+    ones only raise the pending value, which a timer flushes. Durations are
+    monotonic in SQL, so a flush can never lower a stored total.
+    """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._pending: Dict[int, float] = {}
+        self._last_write: Dict[int, float] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def record(self, history_id: int, duration: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            last_write = self._last_write.get(history_id)
+            if last_write is not None and now - last_write < self._interval:
+                self._pending[history_id] = max(duration, self._pending.get(history_id, 0.0))
+                self._schedule_flush()
+                return True
+            self._last_write[history_id] = now
+            duration = max(duration, self._pending.pop(history_id, 0.0))
+        if ListeningHistoryRepository.update_duration(history_id, duration, completed=False):
+            return True
+        with self._lock:
+            self._last_write.pop(history_id, None)
+        return False
+
+    def discard(self, history_id: int) -> float:
+        """Forget a session, returning any duration not yet written."""
+        with self._lock:
+            self._last_write.pop(history_id, None)
+            return self._pending.pop(history_id, 0.0)
+
+    def _schedule_flush(self) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(self._interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+            for history_id in pending:
+                self._last_write[history_id] = now
+            # Sessions that stopped sending heartbeats are dropped from the map.
+            stale_before = now - 6 * self._interval
+            self._last_write = {k: v for k, v in self._last_write.items() if v >= stale_before}
+        for history_id, duration in pending.items():
+            try:
+                ListeningHistoryRepository.update_duration(history_id, duration, completed=False)
+            except Exception as e:
+                logger.warning("Heartbeat flush failed for session %s: %s", history_id, e)
+
+
+_heartbeats = _HeartbeatBuffer(HEARTBEAT_FLUSH_INTERVAL)
+# The flush timer is a daemon thread; write out whatever it has not yet.
+atexit.register(_heartbeats.flush)
+
+
 class ListeningService:
 
     @staticmethod
@@ -23,8 +97,8 @@ class ListeningService:
             "has_quota": minutes_remaining > 0,
             "quota_limit": quota_limit,
             "minutes_used": minutes_used,
-            "minutes_remaining": max(0, minutes_remaining),
-            "unlimited": quota_limit == float('inf')
+            "minutes_remaining": minutes_remaining if minutes_remaining > 0 else 0,
+            "unlimited": quota_limit == QuotaLimits.PREMIUM_DAILY_MINUTES
         }
 
     @staticmethod
@@ -33,36 +107,11 @@ class ListeningService:
 
     @staticmethod
     def update_listening_progress(history_id: int, duration_seconds: float, user_id: Optional[str] = None, ip_address: Optional[str] = None) -> bool:
-        history = ListeningHistoryRepository.get_by_id(history_id)
-        if not history:
-            return False
-
-        # Keep duration monotonic to avoid double-counting when player time jumps backwards.
-        safe_duration = max(0.0, duration_seconds)
-        previous_duration = history.duration_listened or 0
-        effective_duration = max(safe_duration, previous_duration)
-        duration_diff = effective_duration - previous_duration
-        if duration_diff > 0 and (user_id or ip_address):
-            quota = DailyQuotaRepository.get_or_create_today(user_id, ip_address)
-            DailyQuotaRepository.update_quota(quota.id, minutes_listened=duration_diff / 60.0)
-        return ListeningHistoryRepository.update_duration(history_id, effective_duration, completed=False)
+        # The quota trigger credits the duration growth when the value is written.
+        return _heartbeats.record(history_id, max(0.0, duration_seconds))
 
     @staticmethod
     def complete_listening_session(history_id: int, total_duration: float, user_id: Optional[str], ip_address: str) -> bool:
-        history = ListeningHistoryRepository.get_by_id(history_id)
-        if not history:
-            return False
-
-        safe_total_duration = max(0.0, total_duration)
-        previous_duration = history.duration_listened or 0
-        effective_total_duration = max(safe_total_duration, previous_duration)
-        duration_diff = effective_total_duration - previous_duration
-        ListeningHistoryRepository.update_duration(history_id, effective_total_duration, completed=True)
-        quota = DailyQuotaRepository.get_or_create_today(user_id, ip_address)
-        DailyQuotaRepository.update_quota(quota.id, minutes_listened=max(0.0, duration_diff / 60.0), tracks_completed=1)
-        return True
-
-    @staticmethod
-    def increment_track_started(user_id: Optional[str], ip_address: str) -> None:
-        quota = DailyQuotaRepository.get_or_create_today(user_id, ip_address)
-        DailyQuotaRepository.update_quota(quota.id, minutes_listened=0, tracks_started=1)
+        # Buffered progress is folded into the completion write rather than flushed separately.
+        total = max(0.0, total_duration, _heartbeats.discard(history_id))
+        return ListeningHistoryRepository.update_duration(history_id, total, completed=True)
@@ -1,11 +1,13 @@
 import boto3
 import os
 import logging
+from functools import lru_cache
 from pathlib import Path
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from dotenv import load_dotenv
+from shared.config import load_env
 
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +22,16 @@ if not S3_BUCKET_NAME:
 _BUCKET_PUBLIC_BASE_URL = None
 
 
+@lru_cache(maxsize=1)
 def _get_s3_client():
+    # Clients are thread-safe; building one resolves endpoints and credentials,
+    # so every call shares this one and its keep-alive connection pool.
     return boto3.client(
         's3',
         aws_access_key_id=AWS_ACCESS_KEY_ID,
         aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
+        region_name=AWS_REGION,
+        config=Config(max_pool_connections=50, retries={'max_attempts': 3, 'mode': 'adaptive'}),
     )
 
 
@@ -57,18 +63,50 @@ def generate_hls_stream_url(track_id: int) -> str:
     return generate_object_public_url(s3_key)
 
 
+# Written by the processor: hls-cache/<digest> names the track encoded from a
+# source file, hls-cache/tracks/<track id> points back at that digest.
+HLS_CACHE_PREFIX = 'hls-cache'
+
+
+def _delete_hls_cache_marker(s3_client, track_id: int):
+    track_key = f"{HLS_CACHE_PREFIX}/tracks/{track_id}"
+    try:
+        digest = s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=track_key)['Metadata']['source-digest']
+    except (ClientError, KeyError):
+        return
+    marker_key = f"{HLS_CACHE_PREFIX}/{digest}"
+    keys = [{'Key': track_key}]
+    try:
+        # A later upload may have re-pointed the marker at another track.
+        if s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=marker_key)['Metadata'].get('track-id') == str(track_id):
+            keys.append({'Key': marker_key})
+    except (ClientError, KeyError):
+        pass
+    s3_client.delete_objects(Bucket=S3_BUCKET_NAME, Delete={'Objects': keys, 'Quiet': True})
+
+
 def delete_track_files(track_id: int):
     try:
         s3_client = _get_s3_client()
         prefix = f"audio/hls/{track_id}/"
-        response = s3_client.list_objects_v2(Bucket=S3_BUCKET_NAME, Prefix=prefix)
-        objects = response.get('Contents', [])
-        if objects:
-            s3_client.delete_objects(
+        deleted = 0
+        # A listing page holds at most 1000 keys, which is also the
+        # delete_objects limit, so each page is deleted in one request.
+        for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=S3_BUCKET_NAME, Prefix=prefix):
+            objects = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+            if not objects:
+                continue
+            response = s3_client.delete_objects(
                 Bucket=S3_BUCKET_NAME,
-                Delete={'Objects': [{'Key': obj['Key']} for obj in objects]}
+                Delete={'Objects': objects, 'Quiet': True}
             )
-            logger.info(f"Deleted {len(objects)} S3 files for track {track_id}")
+            errors = response.get('Errors', [])
+            if errors:
+                logger.error(f"Failed to delete {len(errors)} S3 files for track {track_id}: {errors[0]}")
+            deleted += len(objects) - len(errors)
+        if deleted:
+            logger.info(f"Deleted {deleted} S3 files for track {track_id}")
+        _delete_hls_cache_marker(s3_client, track_id)
     except ClientError as e:
         logger.error(f"Error deleting S3 files for track {track_id}: {e}")
         raise
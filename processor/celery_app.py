@@ -1,9 +1,10 @@
 from celery import Celery
+from celery.signals import worker_process_init
 import os
 import sys
-from dotenv import load_dotenv
+from shared.config import load_env
 
-load_dotenv()
+load_env()
 
 if sys.version_info >= (3, 13):
     import threading
@@ -33,5 +34,13 @@ celery_app.conf.update(
     task_always_eager=False,
 )
 
+
+@worker_process_init.connect
+def _reset_db_pool(**_):
+    # Prefork children must not reuse pooled connections inherited from the parent.
+    from shared.db.database import engine
+    engine.dispose(close=False)
+
+
 # Import task module to guarantee registration when worker starts with `-A celery_app`.
 import tasks.audio_processing  # noqa: E402,F401
@@ -1,5 +1,5 @@
-from .audio_features import extract_audio_features
+from .audio_features import extract_audio_features, extract_audio_features_batch
 from .embedding_utils import create_embedding_vector
 from .hls_converter import convert_to_hls
 
-__all__ = ["extract_audio_features", "create_embedding_vector", "convert_to_hls"]
+__all__ = ["extract_audio_features", "extract_audio_features_batch", "create_embedding_vector", "convert_to_hls"]
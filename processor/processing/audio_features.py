@@ -1,5 +1,8 @@
+from functools import lru_cache
+
 import librosa
 import numpy as np
+from joblib import Parallel, delayed, parallel_backend
 
 
 def _to_float(value, default=0.0):
@@ -18,57 +21,99 @@ def _to_float(value, default=0.0):
     return float(np.mean(arr))
 
 
+@lru_cache(maxsize=4)
+def _mel_basis(sr):
+    """Mel filterbank for the fixed STFT size; librosa would rebuild it on every call."""
+    return librosa.filters.mel(sr=sr, n_fft=2048, n_mels=128)
+
+
 def extract_audio_features(audio_path, sr=22050, duration=30):
-    y, sr = librosa.load(audio_path, sr=sr, duration=duration)
+    # librosa decodes through soundfile and resamples with soxr (C), not resampy.
+    y, sr = librosa.load(audio_path, sr=sr, duration=duration, res_type='soxr_hq')
     track_duration = librosa.get_duration(y=y, sr=sr)
 
     features = {'duration': _to_float(track_duration)}
 
-    features['spectral_centroid'] = _to_float(np.mean(librosa.feature.spectral_centroid(y=y, sr=sr)))
-    features['spectral_rolloff'] = _to_float(np.mean(librosa.feature.spectral_rolloff(y=y, sr=sr)))
-    features['spectral_bandwidth'] = _to_float(np.mean(librosa.feature.spectral_bandwidth(y=y, sr=sr)))
-
-    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=20)
-    for i in range(20):
-        features[f'mfcc_{i}_mean'] = _to_float(np.mean(mfccs[i]))
-        features[f'mfcc_{i}_std'] = _to_float(np.std(mfccs[i]))
-
-    chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+    # One STFT shared by every spectral feature below; each librosa call would
+    # otherwise compute its own. Magnitude-based features take ``S_mag``, the
+    # chroma/mel ones expect power.
+    stft = librosa.stft(y, n_fft=2048, hop_length=512)
+    S_mag = np.abs(stft)
+    S_power = S_mag ** 2
+
+    features['spectral_centroid'] = _to_float(np.mean(librosa.feature.spectral_centroid(S=S_mag, sr=sr)))
+    # Rolloff is the first bin whose cumulative energy reaches 85% of the
+    # frame total; librosa's default and the explicit 0.85 are the same point.
+    cumulative = np.cumsum(S_mag, axis=0)
+    rolloff_bins = (cumulative >= 0.85 * cumulative[-1]).argmax(axis=0)
+    rolloff_hz = librosa.fft_frequencies(sr=sr, n_fft=2048)[rolloff_bins]
+    features['spectral_rolloff'] = _to_float(np.mean(rolloff_hz))
+    bandwidth = librosa.feature.spectral_bandwidth(S=S_mag, sr=sr)
+    features['spectral_bandwidth'] = _to_float(np.mean(bandwidth))
+
+    mel_spec = _mel_basis(sr) @ S_power
+    mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel_spec), n_mfcc=20)
+    mfcc_means = mfccs.mean(axis=1)
+    mfcc_stds = mfccs.std(axis=1)
+    features.update(zip((f'mfcc_{i}_mean' for i in range(20)), map(float, mfcc_means)))
+    features.update(zip((f'mfcc_{i}_std' for i in range(20)), map(float, mfcc_stds)))
+
+    chroma = librosa.feature.chroma_stft(S=S_power, sr=sr)
     features['chroma_mean'] = _to_float(np.mean(chroma))
     features['chroma_std'] = _to_float(np.std(chroma))
 
-    tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+    # beat_track(y=...) tracks a median-aggregated envelope; match it so tempo
+    # stays comparable with tracks ingested before the envelope was passed in.
+    tempo, beats = librosa.beat.beat_track(
+        onset_envelope=librosa.onset.onset_strength(y=y, sr=sr, aggregate=np.median), sr=sr
+    )
     features['tempo'] = _to_float(tempo, default=120.0)
-    features['beat_strength'] = _to_float(np.mean(librosa.onset.onset_strength(y=y, sr=sr)))
+    features['beat_strength'] = _to_float(np.mean(onset_env))
 
     zcr = librosa.feature.zero_crossing_rate(y)
     features['zcr_mean'] = _to_float(np.mean(zcr))
     features['zcr_var'] = _to_float(np.var(zcr))
 
     rms = librosa.feature.rms(y=y)
-    features['rms_mean'] = _to_float(np.mean(rms))
-    features['rms_std'] = _to_float(np.std(rms))
-    features['rms_var'] = _to_float(np.var(rms))
+    rms_std = float(rms.std())
+    features['rms_mean'] = _to_float(rms.mean())
+    features['rms_std'] = rms_std
+    features['rms_var'] = rms_std * rms_std
 
-    mel_spec = librosa.feature.melspectrogram(y=y, sr=sr)
     features['mel_spec_mean'] = _to_float(np.mean(mel_spec))
     features['mel_spec_std'] = _to_float(np.std(mel_spec))
 
-    features['spectral_contrast_mean'] = _to_float(np.mean(librosa.feature.spectral_contrast(y=y, sr=sr)))
-    features['spectral_flatness'] = _to_float(np.mean(librosa.feature.spectral_flatness(y=y)))
+    features['spectral_contrast_mean'] = _to_float(np.mean(librosa.feature.spectral_contrast(S=S_mag, sr=sr)))
+    features['spectral_flatness'] = _to_float(np.mean(librosa.feature.spectral_flatness(S=S_mag)))
 
-    rolloff_85 = librosa.feature.spectral_rolloff(y=y, sr=sr, roll_percent=0.85)
-    features['spectral_rolloff_85'] = _to_float(np.mean(rolloff_85))
-    features['spectral_bandwidth_var'] = _to_float(np.var(librosa.feature.spectral_bandwidth(y=y, sr=sr)))
+    features['spectral_rolloff_85'] = features['spectral_rolloff']
+    features['spectral_bandwidth_var'] = _to_float(np.var(bandwidth))
+
+    # A single harmonic/percussive split, taken on the shared STFT, feeds both
+    # the tonal features and the harmonic/percussive energy means.
+    stft_harmonic, stft_percussive = librosa.decompose.hpss(stft)
+    y_harmonic = librosa.istft(stft_harmonic, hop_length=512, length=len(y))
+    y_percussive = librosa.istft(stft_percussive, hop_length=512, length=len(y))
 
-    y_harmonic = librosa.effects.harmonic(y)
     features['tonnetz_mean'] = _to_float(np.mean(librosa.feature.tonnetz(y=y_harmonic, sr=sr)))
 
     chroma_cens = librosa.feature.chroma_cens(y=y_harmonic, sr=sr)
     features['chroma_cens_mean'] = _to_float(np.mean(chroma_cens))
 
-    y_harmonic2, y_percussive = librosa.effects.hpss(y)
-    features['harmonic_mean'] = _to_float(np.mean(np.abs(y_harmonic2)))
+    features['harmonic_mean'] = _to_float(np.mean(np.abs(y_harmonic)))
     features['percussive_mean'] = _to_float(np.mean(np.abs(y_percussive)))
 
     return features
+
+
+def extract_audio_features_batch(audio_paths, n_jobs=-1, **kwargs):
+    """Extract features for several files in parallel worker processes.
+
+    Each worker is limited to one BLAS/OpenMP thread so the pool does not
+    oversubscribe the cores. Results are returned in input order.
+    """
+    with parallel_backend("loky", inner_max_num_threads=1):
+        return Parallel(n_jobs=n_jobs, batch_size="auto")(
+            delayed(extract_audio_features)(path, **kwargs) for path in audio_paths
+        )
@@ -1,26 +1,29 @@
 import numpy as np
 
+EMBEDDING_FEATURE_KEYS = (
+    'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth',
+    'spectral_contrast_mean', 'spectral_flatness', 'spectral_rolloff_85',
+    'spectral_bandwidth_var', 'chroma_mean', 'tonnetz_mean',
+    'chroma_cens_mean', 'tempo', 'beat_strength', 'rms_mean',
+    'rms_std', 'rms_var', 'zcr_mean', 'zcr_var', 'harmonic_mean',
+    'percussive_mean', 'mel_spec_mean',
+) + tuple(f'mfcc_{i}_mean' for i in range(20))
+
 
 def select_embedding_features(features_dict):
-    mfcc_means = [f'mfcc_{i}_mean' for i in range(20)]
-    feature_keys = [
-        'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth',
-        'spectral_contrast_mean', 'spectral_flatness', 'spectral_rolloff_85',
-        'spectral_bandwidth_var', 'chroma_mean', 'tonnetz_mean',
-        'chroma_cens_mean', 'tempo', 'beat_strength', 'rms_mean',
-        'rms_std', 'rms_var', 'zcr_mean', 'zcr_var', 'harmonic_mean',
-        'percussive_mean', 'mel_spec_mean'
-    ] + mfcc_means
-    return [float(features_dict.get(k, 0.0) or 0.0) for k in feature_keys]
+    out = np.empty(len(EMBEDDING_FEATURE_KEYS), dtype=np.float32)
+    for i, key in enumerate(EMBEDDING_FEATURE_KEYS):
+        out[i] = features_dict.get(key) or 0.0
+    return out
 
 
 def normalize_embeddings(embeddings):
-    eps = 1e-12
-    v = np.array(embeddings, dtype=float)
-    norm = np.linalg.norm(v)
-    if norm <= eps:
-        return v
-    return v / norm
+    """L2-normalise ``embeddings`` in place when it is already a float array."""
+    v = np.asarray(embeddings, dtype=np.float32)
+    norm = np.sqrt(np.dot(v, v))
+    if norm > 1e-12:
+        v /= norm
+    return v
 
 
 def create_embedding_vector(features_dict):
@@ -1,5 +1,6 @@
 import ffmpeg
 import os
+import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,20 +9,56 @@ logger = logging.getLogger(__name__)
 def _create_key_info_file(track_dir, encryption_key, key_uri):
     key_file = os.path.join(track_dir, 'enc.key')
     key_info_file = os.path.join(track_dir, 'enc.keyinfo')
-    with open(key_file, 'wb') as f:
+    # Owner-only from creation; the key never sits world-readable on disk.
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
         f.write(encryption_key)
     with open(key_info_file, 'w', encoding='utf-8') as f:
         f.write(f"{key_uri}\n{key_file}\n")
     return key_info_file, key_file
 
 
-def _create_master_playlist(master_path, variants):
-    with open(master_path, 'w', encoding='utf-8') as f:
-        f.write('#EXTM3U\n')
-        f.write('#EXT-X-VERSION:3\n')
-        for v in variants:
-            f.write(f"#EXT-X-STREAM-INF:BANDWIDTH={v['bandwidth']},CODECS=\"mp4a.40.2\"\n")
-            f.write(f"{v['uri']}\n")
+# Variant label -> AAC bitrate in kbps. Every track gets the same ladder, so
+# the master playlist (relative variant URIs only) is rendered once.
+HLS_BITRATES = {'64k': 64, '128k': 128, '192k': 192}
+
+_MASTER_PLAYLIST = ''.join(
+    ['#EXTM3U\n', '#EXT-X-VERSION:3\n'] + [
+        f"#EXT-X-STREAM-INF:BANDWIDTH={kbps * 1000},CODECS=\"mp4a.40.2\"\n{label}/playlist.m3u8\n"
+        for label, kbps in HLS_BITRATES.items()
+    ]
+).encode('ascii')
+
+
+def _create_master_playlist(master_path):
+    with open(master_path, 'wb', buffering=0) as f:
+        f.write(_MASTER_PLAYLIST)
+
+
+_KEY_URI = re.compile(r'(#EXT-X-KEY:[^\n]*URI=")[^"]*(")')
+
+
+def rewrite_key_uri(playlist_text, key_uri):
+    """Point every EXT-X-KEY line of a variant playlist at ``key_uri``."""
+    return _KEY_URI.sub(lambda m: f"{m.group(1)}{key_uri}{m.group(2)}", playlist_text)
+
+
+def _probe_aac_bitrate_kbps(input_path):
+    """Bitrate of an AAC-LC source stream in kbps, or None if it must be re-encoded."""
+    try:
+        probe = ffmpeg.probe(input_path)
+    except ffmpeg.Error as e:
+        logger.warning("ffprobe failed for %s, encoding every variant: %s", input_path, e)
+        return None
+    stream = next((s for s in probe.get('streams', []) if s.get('codec_type') == 'audio'), None)
+    # The master playlist advertises mp4a.40.2, so only AAC-LC can be passed through.
+    if not stream or stream.get('codec_name') != 'aac' or stream.get('profile') != 'LC':
+        return None
+    bit_rate = stream.get('bit_rate') or probe.get('format', {}).get('bit_rate')
+    try:
+        return int(bit_rate) // 1000 or None
+    except (TypeError, ValueError):
+        return None
 
 
 def convert_to_hls(input_path, output_dir, track_id, encryption_key=None, key_uri=None):
@@ -32,9 +69,10 @@ def convert_to_hls(input_path, output_dir, track_id, encryption_key=None, key_ur
         raise ValueError("key_uri must be provided when encryption_key is specified")
 
     track_dir = os.path.join(output_dir, str(track_id))
-    os.makedirs(track_dir, exist_ok=True)
-
-    bitrates = {'64k': 64, '128k': 128, '192k': 192}
+    variant_dirs = {label: os.path.join(track_dir, label) for label in HLS_BITRATES}
+    # ffmpeg does not create segment directories; this also creates track_dir.
+    for bitrate_dir in variant_dirs.values():
+        os.makedirs(bitrate_dir, exist_ok=True)
     results = {'track_id': track_id, 'master_playlist': os.path.join(track_dir, 'master.m3u8'), 'variants': {}}
 
     key_info_file = None
@@ -42,12 +80,15 @@ def convert_to_hls(input_path, output_dir, track_id, encryption_key=None, key_ur
     if encryption_key:
         key_info_file, key_file = _create_key_info_file(track_dir, encryption_key, key_uri)
 
-    try:
-        variants_for_master = []
-        for bitrate_label, bitrate_value in bitrates.items():
-            bitrate_dir = os.path.join(track_dir, bitrate_label)
-            os.makedirs(bitrate_dir, exist_ok=True)
+    source_aac_kbps = _probe_aac_bitrate_kbps(input_path)
 
+    try:
+        # One ffmpeg process decodes the source once and feeds every AAC
+        # encoder, instead of a full decode per bitrate.
+        source = ffmpeg.input(input_path)
+        outputs = []
+        for bitrate_label, bitrate_value in HLS_BITRATES.items():
+            bitrate_dir = variant_dirs[bitrate_label]
             playlist_path = os.path.join(bitrate_dir, 'playlist.m3u8')
             segment_pattern = os.path.join(bitrate_dir, 'segment_%03d.ts')
 
@@ -60,25 +101,24 @@ def convert_to_hls(input_path, output_dir, track_id, encryption_key=None, key_ur
                 'hls_playlist_type': 'vod',
                 'hls_flags': 'independent_segments'
             }
+            if source_aac_kbps and source_aac_kbps <= bitrate_value:
+                # Re-encoding AAC at or above its own bitrate gains nothing; remux it.
+                output_options['acodec'] = 'copy'
+                del output_options['audio_bitrate']
             if key_info_file:
                 output_options['hls_key_info_file'] = key_info_file
 
-            (
-                ffmpeg
-                .input(input_path)
-                .output(playlist_path, **output_options)
-                .overwrite_output()
-                .run(capture_stdout=True, capture_stderr=True)
-            )
+            outputs.append(source.audio.output(playlist_path, **output_options))
 
             results['variants'][bitrate_label] = {
                 'playlist': playlist_path,
                 'bitrate_kbps': bitrate_value,
                 'bandwidth': bitrate_value * 1000
             }
-            variants_for_master.append({'bandwidth': bitrate_value * 1000, 'uri': f"{bitrate_label}/playlist.m3u8"})
 
-        _create_master_playlist(results['master_playlist'], variants_for_master)
+        ffmpeg.merge_outputs(*outputs).overwrite_output().run(capture_stdout=True, capture_stderr=True)
+
+        _create_master_playlist(results['master_playlist'])
         return results
 
     finally:
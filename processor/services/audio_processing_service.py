@@ -1,25 +1,74 @@
+import hashlib
 import os
+import secrets
 import shutil
 import logging
-
-from services.s3_service import download_file_from_s3, upload_directory_to_s3, generate_object_url
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from services.s3_service import (
+    download_file_from_s3,
+    upload_directory_to_s3,
+    generate_object_url,
+    SegmentUploader,
+    delete_prefix,
+    drop_hls_cache,
+    lookup_hls_cache,
+    record_hls_cache,
+    copy_hls_output,
+)
 from processing.audio_features import extract_audio_features
 from processing.embedding_utils import create_embedding_vector
-from processing.hls_converter import convert_to_hls
+from processing.hls_converter import convert_to_hls, rewrite_key_uri
 from shared.db.controllers import (
     ProcessingJobRepository,
     TrackRepository,
-    AudioFeaturesRepository,
-    TrackEmbeddingRepository,
     TrackEncryptionKeysRepository,
 )
 
 logger = logging.getLogger(__name__)
 
+# Off-critical-path DB writes; a single thread keeps them ordered per process.
+_db_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+
+# Per-job scratch root; point it at a tmpfs so downloads, segments and the
+# final cleanup never touch disk.
+SCRATCH_DIR = os.getenv('PROCESSOR_SCRATCH_DIR') or tempfile.gettempdir()
+
+
+def _source_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=32)).hexdigest()
+
+
+def _discard_track(track_id, key_write):
+    """Remove a half-built track, its key row and partial HLS output."""
+    if key_write is not None:
+        # The key insert must land (or fail) before its track row goes.
+        try:
+            key_write.result()
+        except Exception:
+            pass
+    try:
+        delete_prefix(f"audio/hls/{track_id}")
+    except Exception as e:
+        logger.warning(f"Could not delete partial HLS output of track {track_id}: {e}")
+    try:
+        TrackRepository.delete(track_id)
+    except Exception as e:
+        logger.warning(f"Could not delete half-built track {track_id}: {e}")
+
 
 def process_audio_file(job_id, s3_input_key, metadata, api_base_url):
-    temp_dir = f'/tmp/{job_id}'
+    """Process one upload into a finished track.
+
+    On failure the track created by this attempt is removed again, so a retry
+    starts from nothing; the job's status is left to the caller, which knows
+    whether another attempt follows.
+    """
+    temp_dir = os.path.join(SCRATCH_DIR, str(job_id))
     track_id = None
+    key_write = None
 
     try:
         ProcessingJobRepository.update_status(job_id, 'processing')
@@ -35,6 +84,15 @@ def process_audio_file(job_id, s3_input_key, metadata, api_base_url):
 
         embedding_vector = create_embedding_vector(features)
 
+        # A byte-identical source that was encoded before (re-upload, retried
+        # import) reuses that track's segments and key instead of re-encoding.
+        source_digest = _source_digest(local_audio_path)
+        cached_track_id = lookup_hls_cache(source_digest)
+        cached_key = TrackEncryptionKeysRepository.get_key_bytes(cached_track_id) if cached_track_id else None
+        if cached_track_id and not cached_key:
+            # The track it names was deleted (its key went with it).
+            drop_hls_cache(source_digest, cached_track_id)
+
         track_data = {
             'title': metadata.get('title', 'Unknown'),
             'artist_name': metadata.get('artist_name') or metadata.get('artist', 'Unknown Artist'),
@@ -47,53 +105,65 @@ def process_audio_file(job_id, s3_input_key, metadata, api_base_url):
         }
         track_id = TrackRepository.create(track_data)
 
-        TrackEncryptionKeysRepository.create(track_id=track_id)
-        encryption_key = TrackEncryptionKeysRepository.get_key_bytes(track_id)
+        # The key is generated here and persisted while ffmpeg encodes; the write
+        # is awaited before the track is marked completed.
+        encryption_key = cached_key or secrets.token_bytes(16)
+        key_write = _db_writer.submit(
+            TrackEncryptionKeysRepository.create, track_id=track_id, encryption_key=encryption_key
+        )
 
         hls_output_dir = os.path.join(temp_dir, 'hls')
         key_uri = f"{api_base_url}/api/v1/keys/{track_id}"
-
-        convert_to_hls(
-            input_path=local_audio_path,
-            output_dir=hls_output_dir,
-            track_id=track_id,
-            encryption_key=encryption_key,
-            key_uri=key_uri
-        )
-
         hls_s3_prefix = f"audio/hls/{track_id}"
         track_hls_dir = os.path.join(hls_output_dir, str(track_id))
-        upload_directory_to_s3(track_hls_dir, hls_s3_prefix)
+
+        if cached_key and copy_hls_output(
+            f"audio/hls/{cached_track_id}", hls_s3_prefix, lambda text: rewrite_key_uri(text, key_uri)
+        ):
+            logger.info(f"Job {job_id} reused the HLS output of track {cached_track_id}")
+        else:
+            if cached_key:
+                # The key outlived the track's HLS output; stop pointing at it.
+                drop_hls_cache(source_digest, cached_track_id)
+            # Finished segments go up while ffmpeg encodes the rest.
+            uploader = SegmentUploader(track_hls_dir, hls_s3_prefix).start()
+            try:
+                convert_to_hls(
+                    input_path=local_audio_path,
+                    output_dir=hls_output_dir,
+                    track_id=track_id,
+                    encryption_key=encryption_key,
+                    key_uri=key_uri
+                )
+            finally:
+                already_uploaded = uploader.stop()
+            upload_directory_to_s3(track_hls_dir, hls_s3_prefix, skip=already_uploaded)
+            record_hls_cache(source_digest, track_id)
 
         cdn_url = generate_object_url(f"{hls_s3_prefix}/master.m3u8")
 
-        duration_sec = features.get('duration', 0)
-        TrackRepository.update(track_id, {
-            'cdn_url': cdn_url,
-            'duration_sec': duration_sec,
-            'processing_status': 'completed'
-        })
+        key_write.result()
 
         features_copy = {k: v for k, v in features.items() if k != 'duration'}
-        features_copy['track_id'] = track_id
-        AudioFeaturesRepository.create(features_copy)
-
-        TrackEmbeddingRepository.create({
-            'track_id': track_id,
-            'embedding_vector': embedding_vector.tolist()
-        })
-
-        ProcessingJobRepository.link_track(job_id, track_id)
-        ProcessingJobRepository.update_status(job_id, 'completed')
+        ProcessingJobRepository.finalize(
+            job_id,
+            track_id,
+            track_updates={
+                'cdn_url': cdn_url,
+                'duration_sec': features.get('duration', 0),
+                'processing_status': 'completed'
+            },
+            features=features_copy,
+            embedding_vector=embedding_vector,
+        )
 
         logger.info(f"Successfully processed job {job_id} -> track {track_id}")
         return {'track_id': track_id, 'cdn_url': cdn_url}
 
     except Exception as e:
         logger.error(f"Error processing job {job_id}: {e}")
-        ProcessingJobRepository.update_status(job_id, 'failed', error_message=str(e))
         if track_id:
-            TrackRepository.update(track_id, {'processing_status': 'failed'})
+            _discard_track(track_id, key_write)
         raise
 
     finally:
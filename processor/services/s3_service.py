@@ -1,11 +1,16 @@
 import boto3
 import os
 import logging
+from functools import lru_cache
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from dotenv import load_dotenv
+from shared.config import load_env
 
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +24,24 @@ if not S3_BUCKET_NAME:
 
 _BUCKET_PUBLIC_BASE_URL = None
 
+UPLOAD_CONCURRENCY = 16
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    max_concurrency=UPLOAD_CONCURRENCY,
+    use_threads=True,
+)
 
+
+@lru_cache(maxsize=1)
 def _get_s3_client():
+    # Clients are thread-safe; building one resolves endpoints and credentials,
+    # so every call shares this one and its keep-alive connection pool.
     return boto3.client(
         's3',
         aws_access_key_id=AWS_ACCESS_KEY_ID,
         aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
+        region_name=AWS_REGION,
+        config=Config(max_pool_connections=50, retries={'max_attempts': 3, 'mode': 'adaptive'}),
     )
 
 
@@ -55,34 +71,53 @@ def generate_object_url(s3_key: str) -> str:
 def download_file_from_s3(s3_key: str, local_path: str):
     try:
         s3_client = _get_s3_client()
-        s3_client.download_file(S3_BUCKET_NAME, s3_key, local_path)
+        s3_client.download_file(S3_BUCKET_NAME, s3_key, local_path, Config=_TRANSFER_CONFIG)
         logger.info(f"Downloaded {s3_key} to {local_path}")
     except ClientError as e:
         logger.error(f"Error downloading {s3_key}: {e}")
         raise
 
 
-def upload_directory_to_s3(local_dir: str, s3_prefix: str):
+def _upload_file(s3_client, file_path: Path, s3_key: str):
+    extra_args = {'ContentType': _get_content_type(file_path.suffix)}
+    try:
+        s3_client.upload_file(
+            str(file_path), S3_BUCKET_NAME, s3_key,
+            ExtraArgs=extra_args, Config=_TRANSFER_CONFIG
+        )
+    except ClientError as upload_error:
+        # Re-raised as is so the task can tell a retryable S3 failure apart.
+        logger.error(f"Failed to upload {file_path} to {S3_BUCKET_NAME}/{s3_key}: {upload_error}")
+        raise
+    return s3_key
+
+
+def _s3_key_for(local_root: Path, file_path: Path, s3_prefix: str) -> str:
+    return f"{s3_prefix}/{file_path.relative_to(local_root).as_posix()}"
+
+
+def upload_directory_to_s3(local_dir: str, s3_prefix: str, skip=frozenset()):
+    """Upload every file under ``local_dir`` except paths in ``skip``.
+
+    Files go up concurrently; playlists are sent only after all segments, so a
+    client never sees a playlist that references a missing segment.
+    """
     try:
         s3_client = _get_s3_client()
         local_path = Path(local_dir)
+        files = [
+            file_path for file_path in local_path.rglob('*')
+            if file_path.is_file() and str(file_path) not in skip
+        ]
+        playlists = [f for f in files if f.suffix == '.m3u8']
+        media = [f for f in files if f.suffix != '.m3u8']
         uploaded = []
-        for file_path in local_path.rglob('*'):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(local_path)
-                s3_key = f"{s3_prefix}/{relative_path}".replace('\\', '/')
-                content_type = _get_content_type(file_path.suffix)
-                extra_args = {'ContentType': content_type}
-                try:
-                    s3_client.upload_file(
-                        str(file_path), S3_BUCKET_NAME, s3_key,
-                        ExtraArgs=extra_args
-                    )
-                except ClientError as upload_error:
-                    raise RuntimeError(
-                        f"Failed to upload {file_path} to {S3_BUCKET_NAME}/{s3_key}: {upload_error}"
-                    ) from upload_error
-                uploaded.append(s3_key)
+        with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+            for batch in (media, playlists):
+                uploaded.extend(executor.map(
+                    lambda f: _upload_file(s3_client, f, _s3_key_for(local_path, f, s3_prefix)),
+                    batch,
+                ))
         logger.info(f"Uploaded {len(uploaded)} files to {s3_prefix}")
         return uploaded
     except Exception as e:
@@ -90,14 +125,190 @@ def upload_directory_to_s3(local_dir: str, s3_prefix: str):
         raise
 
 
+def delete_prefix(s3_prefix: str) -> int:
+    """Delete every object under ``s3_prefix``/ and return how many were removed."""
+    s3_client = _get_s3_client()
+    deleted = 0
+    for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=S3_BUCKET_NAME, Prefix=f"{s3_prefix}/"):
+        objects = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+        if objects:
+            s3_client.delete_objects(Bucket=S3_BUCKET_NAME, Delete={'Objects': objects, 'Quiet': True})
+            deleted += len(objects)
+    return deleted
+
+
+# hls-cache/<source digest> is an empty marker whose metadata names the track
+# that first encoded that exact source file; hls-cache/tracks/<track id> points
+# back at the digest so deleting the track can remove its marker.
+HLS_CACHE_PREFIX = 'hls-cache'
+
+
+def _hls_cache_key(source_digest: str) -> str:
+    return f"{HLS_CACHE_PREFIX}/{source_digest}"
+
+
+def _hls_cache_track_key(track_id: int) -> str:
+    return f"{HLS_CACHE_PREFIX}/tracks/{track_id}"
+
+
+def lookup_hls_cache(source_digest: str):
+    """Track id whose HLS output was encoded from this source, or None."""
+    try:
+        head = _get_s3_client().head_object(Bucket=S3_BUCKET_NAME, Key=_hls_cache_key(source_digest))
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+            logger.warning(f"HLS cache lookup failed for {source_digest}: {e}")
+        return None
+    try:
+        return int(head.get('Metadata', {})['track-id'])
+    except (KeyError, ValueError):
+        return None
+
+
+def record_hls_cache(source_digest: str, track_id: int):
+    s3_client = _get_s3_client()
+    try:
+        s3_client.put_object(
+            Bucket=S3_BUCKET_NAME,
+            Key=_hls_cache_track_key(track_id),
+            Body=b'',
+            Metadata={'source-digest': source_digest},
+        )
+        s3_client.put_object(
+            Bucket=S3_BUCKET_NAME,
+            Key=_hls_cache_key(source_digest),
+            Body=b'',
+            Metadata={'track-id': str(track_id)},
+        )
+    except ClientError as e:
+        logger.warning(f"Could not record HLS cache entry for track {track_id}: {e}")
+
+
+def drop_hls_cache(source_digest: str, track_id: int):
+    """Remove a marker found to name a track whose output or key is gone."""
+    try:
+        _get_s3_client().delete_objects(
+            Bucket=S3_BUCKET_NAME,
+            Delete={
+                'Objects': [{'Key': _hls_cache_key(source_digest)}, {'Key': _hls_cache_track_key(track_id)}],
+                'Quiet': True,
+            },
+        )
+    except ClientError as e:
+        logger.warning(f"Could not drop stale HLS cache entry {source_digest}: {e}")
+
+
+def copy_hls_output(src_prefix: str, dst_prefix: str, rewrite_playlist) -> bool:
+    """Server-side copy of one track's HLS output to another prefix.
+
+    Segments and the master playlist are copied without leaving S3; variant
+    playlists pass through ``rewrite_playlist`` (text in, text out) first.
+    Returns False, having copied nothing, if ``src_prefix`` holds no output.
+    """
+    s3_client = _get_s3_client()
+    keys = [
+        obj['Key']
+        for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=S3_BUCKET_NAME, Prefix=f"{src_prefix}/")
+        for obj in page.get('Contents', [])
+    ]
+    if not any(key.endswith('/master.m3u8') for key in keys):
+        return False
+
+    def copy(src_key):
+        dst_key = f"{dst_prefix}/{src_key[len(src_prefix) + 1:]}"
+        content_type = _get_content_type(Path(src_key).suffix)
+        if src_key.endswith('/playlist.m3u8'):
+            body = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=src_key)['Body'].read().decode('utf-8')
+            s3_client.put_object(
+                Bucket=S3_BUCKET_NAME, Key=dst_key, ContentType=content_type,
+                Body=rewrite_playlist(body).encode('utf-8'),
+            )
+        else:
+            s3_client.copy_object(
+                Bucket=S3_BUCKET_NAME, Key=dst_key, ContentType=content_type,
+                CopySource={'Bucket': S3_BUCKET_NAME, 'Key': src_key}, MetadataDirective='REPLACE',
+            )
+
+    playlists = [k for k in keys if k.endswith('.m3u8')]
+    media = [k for k in keys if not k.endswith('.m3u8')]
+    with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+        for batch in (media, playlists):
+            list(executor.map(copy, batch))
+    logger.info(f"Copied {len(keys)} HLS objects from {src_prefix} to {dst_prefix}")
+    return True
+
+
+def _segment_index(path: Path) -> int:
+    return int(path.stem.rsplit('_', 1)[1])
+
+
+class SegmentUploader:
+    """Upload HLS segments to S3 while ffmpeg is still writing later ones.
+
+    A segment counts as finished once a later segment exists in the same
+    variant directory. Whatever is still pending when :meth:`stop` is called
+    (the last segment of each variant, the playlists) is left for
+    :func:`upload_directory_to_s3` with ``skip=uploader.stop()``.
+    """
+
+    def __init__(self, local_dir: str, s3_prefix: str, poll_interval: float = 0.5):
+        self._root = Path(local_dir)
+        self._prefix = s3_prefix
+        self._poll_interval = poll_interval
+        self._client = _get_s3_client()
+        self._executor = ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY)
+        self._futures = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='segment-uploader', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _scan(self):
+        if not self._root.is_dir():
+            return
+        for variant_dir in self._root.iterdir():
+            if not variant_dir.is_dir():
+                continue
+            # By index, not name: segment_1000.ts sorts before segment_999.ts.
+            segments = sorted(variant_dir.glob('*.ts'), key=_segment_index)
+            for segment in segments[:-1]:
+                key = str(segment)
+                if key not in self._futures:
+                    self._futures[key] = self._executor.submit(
+                        _upload_file, self._client, segment, _s3_key_for(self._root, segment, self._prefix)
+                    )
+
+    def _run(self):
+        while not self._stopped.wait(self._poll_interval):
+            try:
+                self._scan()
+            except OSError as e:
+                logger.warning(f"Segment scan failed under {self._root}: {e}")
+
+    def stop(self):
+        """Stop watching, wait for in-flight uploads and return the local paths uploaded."""
+        self._stopped.set()
+        self._thread.join()
+        try:
+            for future in self._futures.values():
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+        return frozenset(self._futures)
+
+
+_CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+    '.key': 'application/octet-stream',
+    '.mp3': 'audio/mpeg',
+    '.mp4': 'audio/mp4',
+    '.aac': 'audio/aac',
+    '.flac': 'audio/flac',
+}
+
+
 def _get_content_type(extension: str) -> str:
-    types = {
-        '.m3u8': 'application/vnd.apple.mpegurl',
-        '.ts': 'video/mp2t',
-        '.key': 'application/octet-stream',
-        '.mp3': 'audio/mpeg',
-        '.mp4': 'audio/mp4',
-        '.aac': 'audio/aac',
-        '.flac': 'audio/flac',
-    }
-    return types.get(extension.lower(), 'application/octet-stream')
+    return _CONTENT_TYPES.get(extension.lower(), 'application/octet-stream')
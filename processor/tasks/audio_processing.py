@@ -1,5 +1,9 @@
+from botocore.exceptions import BotoCoreError, ClientError
+from celery.utils.time import get_exponential_backoff_interval
+from sqlalchemy.exc import OperationalError
+
 from celery_app import celery_app
-from services.audio_processing_service import process_audio_file
+from services.audio_processing_service import SCRATCH_DIR, process_audio_file
 from shared.db.controllers import ProcessingJobRepository
 import logging
 import os
@@ -10,8 +14,36 @@ logger = logging.getLogger(__name__)
 # This URL is written into HLS manifests as EXT-X-KEY URI and must be reachable by browsers.
 API_BASE_URL = os.getenv('HLS_KEY_BASE_URL') or os.getenv('API_BASE_URL', 'http://localhost:8000')
 
+# Failures worth another attempt: network hiccups and a database that is
+# briefly unreachable. Anything else (missing job, undecodable audio, ffmpeg
+# rejecting the input) fails the same way every time.
+TRANSIENT_ERRORS = (BotoCoreError, OperationalError, ConnectionError, TimeoutError)
+
+# S3 error codes that clear up on their own. Other 4xx codes (NoSuchKey,
+# AccessDenied, ...) are permanent and fail the job straight away.
+RETRYABLE_S3_CODES = {
+    'Throttling', 'ThrottlingException', 'SlowDown',
+    'RequestTimeout', 'RequestTimeoutException', 'RequestLimitExceeded',
+}
+
+RETRY_BACKOFF = 30
+RETRY_BACKOFF_MAX = 600
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        response = error.response or {}
+        code = response.get('Error', {}).get('Code', '')
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return code in RETRYABLE_S3_CODES or status >= 500
+    return isinstance(error, TRANSIENT_ERRORS)
+
 
-@celery_app.task(name='tasks.process_audio', bind=True)
+@celery_app.task(
+    name='tasks.process_audio',
+    bind=True,
+    max_retries=3,
+)
 def process_audio_task(self, job_id: str, metadata):
     try:
         logger.info(f"[TASK] Starting audio processing for job {job_id}")
@@ -34,17 +66,27 @@ def process_audio_task(self, job_id: str, metadata):
         return result
 
     except Exception as e:
+        if _is_transient(e) and self.request.retries < self.max_retries:
+            # The job stays 'processing' until the next attempt settles it.
+            logger.warning(
+                f"[TASK] Transient error on job {job_id} "
+                f"(attempt {self.request.retries + 1}/{self.max_retries + 1}), retrying: {e}"
+            )
+            countdown = get_exponential_backoff_interval(
+                RETRY_BACKOFF, self.request.retries, RETRY_BACKOFF_MAX, full_jitter=True
+            )
+            raise self.retry(exc=e, countdown=countdown)
         logger.error(f"[TASK] Error processing job {job_id}: {e}")
         try:
             ProcessingJobRepository.update_status(job_id, 'failed', error_message=str(e))
         except Exception as db_error:
             logger.error(f"[TASK] Failed to update job status: {db_error}")
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        raise
 
 
 @celery_app.task(name='tasks.cleanup_temp_files')
 def cleanup_temp_files_task(job_id: str):
-    temp_dir = f'/tmp/{job_id}'
+    temp_dir = os.path.join(SCRATCH_DIR, str(job_id))
     if os.path.exists(temp_dir):
         shutil.rmtree(temp_dir)
         logger.info(f"Cleaned up temp dir: {temp_dir}")
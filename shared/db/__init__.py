@@ -1,3 +1,3 @@
-from shared.db.database import Base, get_db_session, SessionLocal, engine, create_tables
+from shared.db.database import Base, get_db_session, with_session, SessionLocal, engine, create_tables
 
-__all__ = ['Base', 'get_db_session', 'SessionLocal', 'engine', 'create_tables']
+__all__ = ['Base', 'get_db_session', 'with_session', 'SessionLocal', 'engine', 'create_tables']
@@ -0,0 +1,63 @@
+import io
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+BULK_BATCH_SIZE = 1000
+# Above this many rows a COPY stream beats batched INSERTs.
+COPY_THRESHOLD = 5000
+
+
+def chunked(items: Iterable[T], size: int = BULK_BATCH_SIZE) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _copy_value(value: Any) -> str:
+    # Unquoted empty is NULL in CSV COPY; every non-null value is quoted so an
+    # empty string stays an empty string.
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif hasattr(value, 'tolist'):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        value = '[' + ','.join(map(str, value)) + ']'
+    text_value = str(value)
+    return '"' + text_value.replace('"', '""') + '"'
+
+
+def copy_rows(session, model, rows: List[Dict[str, Any]]) -> int:
+    """Stream ``rows`` into ``model``'s table with COPY on the session's connection.
+
+    COPY bypasses SQLAlchemy, so scalar Python-side column defaults are filled
+    in here; columns without one are written as NULL when a row omits them.
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    defaults = {
+        column.key: column.default.arg
+        for column in table.columns
+        if column.default is not None and column.default.is_scalar
+    }
+    keys = {key for row in rows for key in row}
+    columns = [column.key for column in table.columns if column.key in keys or column.key in defaults]
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(
+            _copy_value(row[key] if key in row else defaults.get(key)) for key in columns
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    column_list = ', '.join(f'"{key}"' for key in columns)
+    raw_connection = session.connection().connection.driver_connection
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+    return len(rows)
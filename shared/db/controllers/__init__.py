@@ -1,14 +1,36 @@
-from .track_controller import TrackRepository
-from .audio_features_controller import AudioFeaturesRepository
-from .track_embedding_controller import TrackEmbeddingRepository
-from .processing_job_controller import ProcessingJobRepository
-from .track_encryption_keys_controller import TrackEncryptionKeysRepository
-from .listening_history_controller import ListeningHistoryRepository, DailyQuotaRepository
-from .analytics_controller import AnalyticsRepository
-from .banner_controller import BannerRepository
-from .admin_curated_track_controller import AdminCuratedTrackRepository
-from .track_like_controller import TrackLikeRepository
-from .playlist_controller import PlaylistRepository, PlaylistTrackRepository
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .track_controller import TrackRepository
+    from .audio_features_controller import AudioFeaturesRepository
+    from .track_embedding_controller import TrackEmbeddingRepository
+    from .processing_job_controller import ProcessingJobRepository
+    from .track_encryption_keys_controller import TrackEncryptionKeysRepository
+    from .listening_history_controller import ListeningHistoryRepository, DailyQuotaRepository
+    from .analytics_controller import AnalyticsRepository
+    from .banner_controller import BannerRepository
+    from .admin_curated_track_controller import AdminCuratedTrackRepository
+    from .track_like_controller import TrackLikeRepository
+    from .playlist_controller import PlaylistRepository, PlaylistTrackRepository
+
+# Repositories are imported on first access so a service only pays for the
+# controllers it actually uses.
+_REPOSITORY_MODULES = {
+    'TrackRepository': '.track_controller',
+    'AudioFeaturesRepository': '.audio_features_controller',
+    'TrackEmbeddingRepository': '.track_embedding_controller',
+    'ProcessingJobRepository': '.processing_job_controller',
+    'TrackEncryptionKeysRepository': '.track_encryption_keys_controller',
+    'ListeningHistoryRepository': '.listening_history_controller',
+    'DailyQuotaRepository': '.listening_history_controller',
+    'AnalyticsRepository': '.analytics_controller',
+    'BannerRepository': '.banner_controller',
+    'AdminCuratedTrackRepository': '.admin_curated_track_controller',
+    'TrackLikeRepository': '.track_like_controller',
+    'PlaylistRepository': '.playlist_controller',
+    'PlaylistTrackRepository': '.playlist_controller',
+}
 
 __all__ = [
     'TrackRepository', 'AudioFeaturesRepository', 'TrackEmbeddingRepository',
@@ -17,3 +39,17 @@ __all__ = [
     'AnalyticsRepository', 'BannerRepository', 'AdminCuratedTrackRepository',
     'TrackLikeRepository', 'PlaylistRepository', 'PlaylistTrackRepository'
 ]
+
+
+def __getattr__(name):
+    module_name = _REPOSITORY_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,5 +1,6 @@
 from datetime import datetime, UTC
 from typing import Optional, List, Dict, Any
+from sqlalchemy import delete
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from shared.db.database import get_db_session
@@ -45,8 +46,5 @@ class AdminCuratedTrackRepository:
     @staticmethod
     def remove(track_id: int) -> bool:
         with get_db_session() as session:
-            row = session.query(AdminCuratedTrack).filter(AdminCuratedTrack.track_id == track_id).first()
-            if not row:
-                return False
-            session.delete(row)
-            return True
+            result = session.execute(delete(AdminCuratedTrack).where(AdminCuratedTrack.track_id == track_id))
+            return result.rowcount > 0
@@ -1,9 +1,12 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import Optional, List, Dict, Any
 import logging
 
 from shared.db.models.audio_features import AudioFeatures
 from shared.db.database import get_db_session
+from shared.db.bulk import chunked
 
 logger = logging.getLogger(__name__)
 
@@ -14,27 +17,51 @@ class AudioFeaturesRepository:
     def create(features_data: Dict[str, Any]) -> Optional[int]:
         try:
             with get_db_session() as session:
-                features = AudioFeatures(**features_data)
-                session.add(features)
-                session.flush()
-                return features.feature_id
+                return session.execute(
+                    insert(AudioFeatures).values(**features_data).returning(AudioFeatures.feature_id)
+                ).scalar_one()
         except IntegrityError as e:
-            logger.error(f"Integrity error creating audio features: {e}")
+            logger.error("Integrity error creating audio features: %s", e)
             raise
         except SQLAlchemyError as e:
-            logger.error(f"Database error creating audio features: {e}")
+            logger.error("Database error creating audio features: %s", e)
+            raise
+
+    @staticmethod
+    def bulk_create(features_data: List[Dict[str, Any]]) -> int:
+        """Insert features for many tracks, skipping tracks that already have a row."""
+        if not features_data:
+            return 0
+        try:
+            with get_db_session() as session:
+                created = 0
+                for batch in chunked(features_data):
+                    created += len(session.scalars(
+                        pg_insert(AudioFeatures).values(batch)
+                        .on_conflict_do_nothing(index_elements=[AudioFeatures.track_id])
+                        .returning(AudioFeatures.feature_id)
+                    ).all())
+                logger.info("Bulk created %s audio feature rows (%s skipped)", created, len(features_data) - created)
+                return created
+        except IntegrityError as e:
+            logger.error("Integrity error bulk creating audio features: %s", e)
+            raise
+        except SQLAlchemyError as e:
+            logger.error("Database error bulk creating audio features: %s", e)
             raise
 
     @staticmethod
     def get_by_track_id(track_id: int) -> Optional[AudioFeatures]:
         try:
             with get_db_session() as session:
+                # track_id carries a unique constraint, so this is a single
+                # index probe; feature_id is the primary key, not track_id.
                 features = session.query(AudioFeatures).filter(
                     AudioFeatures.track_id == track_id
-                ).first()
+                ).one_or_none()
                 if features:
                     session.expunge(features)
                 return features
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching audio features for track {track_id}: {e}")
+            logger.error("Error fetching audio features for track %s: %s", track_id, e)
             raise
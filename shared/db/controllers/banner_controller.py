@@ -1,13 +1,15 @@
-from datetime import datetime, UTC
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Optional, List, Dict, Any
 import logging
 
 from shared.db.models.banner import Banner
-from shared.db.database import get_db_session
+from shared.db.database import get_db_session, utc_now
 
 logger = logging.getLogger(__name__)
 
+_UPDATABLE_COLUMNS = frozenset(Banner.__table__.columns.keys()) - {'banner_id', 'updated_at'}
+
 
 class BannerRepository:
 
@@ -19,10 +21,10 @@ class BannerRepository:
                 session.add(banner)
                 session.flush()
                 banner_id = banner.banner_id
-                logger.info(f"Created banner {banner_id}: {banner_data.get('title')}")
+                logger.info("Created banner %s: %s", banner_id, banner_data.get('title'))
                 return banner_id
         except SQLAlchemyError as e:
-            logger.error(f"Database error creating banner: {e}")
+            logger.error("Database error creating banner: %s", e)
             raise
 
     @staticmethod
@@ -34,7 +36,7 @@ class BannerRepository:
                     session.expunge(banner)
                 return banner
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching banner {banner_id}: {e}")
+            logger.error("Error fetching banner %s: %s", banner_id, e)
             raise
 
     @staticmethod
@@ -51,7 +53,7 @@ class BannerRepository:
                     session.expunge(b)
                 return banners
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching active banners: {e}")
+            logger.error("Error fetching active banners: %s", e)
             raise
 
     @staticmethod
@@ -67,23 +69,20 @@ class BannerRepository:
                     session.expunge(b)
                 return banners
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching all banners: {e}")
+            logger.error("Error fetching all banners: %s", e)
             raise
 
     @staticmethod
     def update(banner_id: int, update_data: Dict[str, Any]) -> bool:
         try:
             with get_db_session() as session:
-                banner = session.query(Banner).filter(Banner.banner_id == banner_id).first()
-                if not banner:
-                    return False
-                for key, value in update_data.items():
-                    if hasattr(banner, key):
-                        setattr(banner, key, value)
-                banner.updated_at = datetime.now(UTC)
-                return True
+                values = {key: value for key, value in update_data.items() if key in _UPDATABLE_COLUMNS}
+                result = session.execute(
+                    update(Banner).where(Banner.banner_id == banner_id).values(updated_at=utc_now(), **values)
+                )
+                return result.rowcount > 0
         except SQLAlchemyError as e:
-            logger.error(f"Error updating banner {banner_id}: {e}")
+            logger.error("Error updating banner %s: %s", banner_id, e)
             raise
 
     @staticmethod
@@ -96,8 +95,8 @@ class BannerRepository:
                     return None
                 image_key = banner.image_key
                 session.delete(banner)
-                logger.info(f"Deleted banner {banner_id}")
+                logger.info("Deleted banner %s", banner_id)
                 return image_key
         except SQLAlchemyError as e:
-            logger.error(f"Error deleting banner {banner_id}: {e}")
+            logger.error("Error deleting banner %s: %s", banner_id, e)
             raise
@@ -1,57 +1,92 @@
-from sqlalchemy import and_, desc, func
+from sqlalchemy import Boolean, and_, bindparam, desc, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
 from datetime import datetime, UTC
 from typing import Optional
 from uuid import UUID
 
-from shared.db.database import SessionLocal
+from shared.db.database import get_db_session
 from shared.db.models.listening_history import UserListeningHistory, DailyListenQuota
 from shared.db.models.tracks import Track
+from shared.util.cache import cache_key, cached, get_json, set_json, incr_float, invalidate
+
+# Cached quota totals are adjusted in place on every write and re-read from
+# daily_listen_quota when they expire, which bounds any drift to this window.
+QUOTA_CACHE_TTL = 60
+
+_previous = aliased(UserListeningHistory)
+
+# Hot-path statements are built once so SQLAlchemy's compiled cache is always warm.
+# The self-join exposes the pre-update duration, so the caller learns the delta
+# the quota trigger credited without a separate read.
+_UPDATE_DURATION = (
+    update(UserListeningHistory)
+    .where(UserListeningHistory.id == bindparam('history_id'))
+    .where(_previous.id == UserListeningHistory.id)
+    # Durations only grow: a late or replayed heartbeat cannot wind the total back.
+    .values(
+        duration_listened=func.greatest(
+            func.coalesce(UserListeningHistory.duration_listened, 0), bindparam('duration')
+        ),
+        # Likewise completion is sticky: a late progress write cannot clear it.
+        completed=or_(
+            func.coalesce(UserListeningHistory.completed, False), bindparam('is_completed', type_=Boolean)
+        ),
+    )
+    .returning(
+        UserListeningHistory.user_id,
+        UserListeningHistory.ip_address,
+        UserListeningHistory.duration_listened,
+        _previous.duration_listened.label('previous_duration'),
+    )
+)
 
 
 class ListeningHistoryRepository:
+    """History writes also update daily_listen_quota through the
+    trg_listening_history_quota trigger; duration writes mirror the credited
+    minutes onto the listener's cached quota total."""
 
     @staticmethod
     def create(user_id: Optional[str], track_id: int, ip_address: str) -> int:
-        session = SessionLocal()
-        try:
-            history = UserListeningHistory(user_id=user_id, track_id=track_id, ip_address=ip_address)
-            session.add(history)
-            session.commit()
-            session.refresh(history)
-            return history.id
-        finally:
-            session.close()
+        with get_db_session() as session:
+            history_id = session.execute(
+                insert(UserListeningHistory)
+                .values(user_id=user_id, track_id=track_id, ip_address=ip_address)
+                .returning(UserListeningHistory.id)
+            ).scalar_one()
+        if user_id:
+            invalidate("user_top_tracks", user_id)
+        return history_id
 
     @staticmethod
     def update_duration(history_id: int, duration: float, completed: bool = False) -> bool:
-        session = SessionLocal()
-        try:
-            history = session.query(UserListeningHistory).filter(
-                UserListeningHistory.id == history_id
+        with get_db_session() as session:
+            row = session.execute(
+                _UPDATE_DURATION,
+                {"history_id": history_id, "duration": duration, "is_completed": completed},
             ).first()
-            if history:
-                history.duration_listened = duration
-                history.completed = completed
-                session.commit()
-                return True
+        if row is None:
             return False
-        finally:
-            session.close()
+        delta = (row.duration_listened or 0) - (row.previous_duration or 0)
+        if delta > 0:
+            DailyQuotaRepository.add_today_minutes(row.user_id, row.ip_address, delta / 60.0)
+        return True
 
     @staticmethod
     def get_by_id(history_id: int) -> Optional[UserListeningHistory]:
-        session = SessionLocal()
-        try:
-            return session.query(UserListeningHistory).filter(
+        with get_db_session() as session:
+            history = session.query(UserListeningHistory).filter(
                 UserListeningHistory.id == history_id
             ).first()
-        finally:
-            session.close()
+            if history:
+                session.expunge(history)
+            return history
 
     @staticmethod
+    @cached("user_top_tracks", ttl=300, scoped=True)
     def get_user_top_tracks(user_id: UUID, limit: int = 10) -> list[dict]:
-        session = SessionLocal()
-        try:
+        with get_db_session() as session:
             rows = session.query(
                 Track,
                 func.count(UserListeningHistory.id).label("play_count"),
@@ -76,8 +111,6 @@ class ListeningHistoryRepository:
                 }
                 for track, play_count, total_duration in rows
             ]
-        finally:
-            session.close()
 
 
 class DailyQuotaRepository:
@@ -94,50 +127,84 @@ class DailyQuotaRepository:
             return None
 
     @staticmethod
-    def get_or_create_today(user_id: Optional[str], ip_address: Optional[str]) -> DailyListenQuota:
-        session = SessionLocal()
-        try:
-            day_start = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start.replace(hour=23, minute=59, second=59, microsecond=999999)
+    def _today_start() -> datetime:
+        return datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
 
-            normalized_user_id = DailyQuotaRepository._normalize_user_id(user_id)
+    @staticmethod
+    def _quota_cache_scope(user_id: Optional[UUID], ip_address: Optional[str], day_start: datetime) -> str:
+        scope = str(user_id) if user_id else f"ip:{ip_address}"
+        return f"{scope}:{day_start.astimezone(UTC):%Y%m%d}"
 
-            query = session.query(DailyListenQuota).filter(
-                DailyListenQuota.date >= day_start,
-                DailyListenQuota.date <= day_end,
+    @staticmethod
+    def invalidate_today(user_id: Optional[str], ip_address: Optional[str]) -> None:
+        normalized_user_id = DailyQuotaRepository._normalize_user_id(user_id)
+        day_start = DailyQuotaRepository._today_start()
+        invalidate("quota", DailyQuotaRepository._quota_cache_scope(normalized_user_id, ip_address, day_start))
+
+    @staticmethod
+    def add_today_minutes(user_id: Optional[str], ip_address: Optional[str], minutes: float) -> None:
+        normalized_user_id = DailyQuotaRepository._normalize_user_id(user_id)
+        day_start = DailyQuotaRepository._today_start()
+        incr_float(
+            cache_key("quota", DailyQuotaRepository._quota_cache_scope(normalized_user_id, ip_address, day_start)),
+            minutes,
+        )
+
+    @staticmethod
+    def _today_filter(stmt, user_id: Optional[UUID], ip_address: Optional[str], day_start: datetime):
+        day_end = day_start.replace(hour=23, minute=59, second=59, microsecond=999999)
+        stmt = stmt.where(
+            DailyListenQuota.date >= day_start,
+            DailyListenQuota.date <= day_end,
+        )
+        if user_id:
+            return stmt.where(DailyListenQuota.user_id == user_id)
+        return stmt.where(
+            and_(DailyListenQuota.user_id.is_(None), DailyListenQuota.ip_address == ip_address)
+        )
+
+    @staticmethod
+    def get_or_create_today(user_id: Optional[str], ip_address: Optional[str]) -> DailyListenQuota:
+        with get_db_session() as session:
+            day_start = DailyQuotaRepository._today_start()
+            normalized_user_id = DailyQuotaRepository._normalize_user_id(user_id)
+            existing = DailyQuotaRepository._today_filter(
+                select(DailyListenQuota), normalized_user_id, ip_address, day_start
             )
-            if normalized_user_id:
-                query = query.filter(DailyListenQuota.user_id == normalized_user_id)
-            else:
-                query = query.filter(
-                    and_(DailyListenQuota.user_id.is_(None), DailyListenQuota.ip_address == ip_address)
-                )
-            quota = query.first()
+
+            quota = session.scalars(existing).first()
             if not quota:
-                quota = DailyListenQuota(user_id=normalized_user_id, date=day_start, ip_address=ip_address)
-                session.add(quota)
-                session.commit()
-                session.refresh(quota)
+                # The unique (user_id, date) / (ip_address, date) indexes make a
+                # concurrent first play of the day fall back to the winner's row.
+                quota = session.scalars(
+                    pg_insert(DailyListenQuota)
+                    .values(user_id=normalized_user_id, date=day_start, ip_address=ip_address)
+                    .on_conflict_do_nothing()
+                    .returning(DailyListenQuota)
+                ).first()
+                if not quota:
+                    quota = session.scalars(existing).one()
+            session.expunge(quota)
             return quota
-        finally:
-            session.close()
-
-    @staticmethod
-    def update_quota(quota_id: int, minutes_listened: float, tracks_started: int = 0, tracks_completed: int = 0) -> bool:
-        session = SessionLocal()
-        try:
-            quota = session.query(DailyListenQuota).filter(DailyListenQuota.id == quota_id).first()
-            if quota:
-                quota.minutes_listened += minutes_listened
-                quota.tracks_started += tracks_started
-                quota.tracks_completed += tracks_completed
-                session.commit()
-                return True
-            return False
-        finally:
-            session.close()
 
     @staticmethod
     def get_today_minutes(user_id: Optional[str], ip_address: Optional[str]) -> float:
-        quota = DailyQuotaRepository.get_or_create_today(user_id, ip_address)
-        return quota.minutes_listened
+        normalized_user_id = DailyQuotaRepository._normalize_user_id(user_id)
+        day_start = DailyQuotaRepository._today_start()
+        key = cache_key("quota", DailyQuotaRepository._quota_cache_scope(normalized_user_id, ip_address, day_start))
+        cached_minutes = get_json(key)
+        if cached_minutes is not None:
+            return float(cached_minutes)
+
+        with get_db_session() as session:
+            minutes = session.execute(
+                DailyQuotaRepository._today_filter(
+                    select(DailyListenQuota.minutes_listened),
+                    normalized_user_id,
+                    ip_address,
+                    day_start,
+                ).limit(1)
+            ).scalar()
+        minutes = float(minutes or 0.0)
+        set_json(key, minutes, QUOTA_CACHE_TTL)
+        return minutes
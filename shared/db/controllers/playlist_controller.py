@@ -1,9 +1,8 @@
-from datetime import datetime, UTC
 from typing import Optional, List, Dict, Any
 from uuid import UUID
-from sqlalchemy import func, desc
+from sqlalchemy import delete, func, desc, exists, select
 
-from shared.db.database import get_db_session
+from shared.db.database import get_db_session, utc_now
 from shared.db.models.playlist import Playlist, PlaylistTrack
 from shared.db.models.tracks import Track
 
@@ -83,7 +82,7 @@ class PlaylistRepository:
             for key, value in update_data.items():
                 if hasattr(playlist, key):
                     setattr(playlist, key, value)
-            playlist.updated_at = datetime.now(UTC)
+            playlist.updated_at = utc_now()
             return True
 
     @staticmethod
@@ -111,11 +110,11 @@ class PlaylistTrackRepository:
             if not playlist:
                 return False
 
-            existing = session.query(PlaylistTrack).filter(
+            already_added = session.scalar(select(exists().where(
                 PlaylistTrack.playlist_id == playlist_id,
                 PlaylistTrack.track_id == track_id,
-            ).first()
-            if existing:
+            )))
+            if already_added:
                 return False
 
             max_position = session.query(PlaylistTrack).filter(
@@ -129,22 +128,16 @@ class PlaylistTrackRepository:
     @staticmethod
     def remove_track(playlist_id: UUID, owner_user_id: UUID, track_id: int) -> bool:
         with get_db_session() as session:
-            playlist = session.query(Playlist).filter(
-                Playlist.playlist_id == playlist_id,
-                Playlist.user_id == owner_user_id,
-            ).first()
-            if not playlist:
-                return False
-
-            row = session.query(PlaylistTrack).filter(
+            # Ownership is checked in the same statement; a foreign playlist deletes nothing.
+            result = session.execute(delete(PlaylistTrack).where(
                 PlaylistTrack.playlist_id == playlist_id,
                 PlaylistTrack.track_id == track_id,
-            ).first()
-            if not row:
-                return False
-
-            session.delete(row)
-            return True
+                exists().where(
+                    Playlist.playlist_id == playlist_id,
+                    Playlist.user_id == owner_user_id,
+                ),
+            ))
+            return result.rowcount > 0
 
     @staticmethod
     def get_playlist_tracks(playlist_id: UUID) -> List[Dict[str, Any]]:
@@ -158,7 +151,7 @@ class PlaylistTrackRepository:
             return [
                 {
                     'position': playlist_track.position,
-                    'added_at': playlist_track.added_at.isoformat() if playlist_track.added_at else None,
+                    'added_at': playlist_track.added_at,
                     'track': track.to_dict(),
                 }
                 for playlist_track, track in rows
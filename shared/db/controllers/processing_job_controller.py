@@ -1,106 +1,176 @@
-from datetime import datetime, UTC
+from sqlalchemy import Integer, String, cast, column, insert, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import uuid
 import logging
 
 from shared.db.models.processing_jobs import ProcessingJob
-from shared.db.database import get_db_session
+from shared.db.models.tracks import Track
+from shared.db.models.audio_features import AudioFeatures
+from shared.db.models.track_embedding import TrackEmbedding
+from shared.db.database import get_db_session, utc_now
+from shared.util.cache import cache_key, get_json, set_json, invalidate, model_to_cache, model_from_cache
 
 logger = logging.getLogger(__name__)
 
+# Jobs are polled by the upload service and read by the processor worker, so
+# the cache lives in Redis rather than in either process.
+JOB_CACHE_TTL = 300
+
 
 class ProcessingJobRepository:
 
+    @staticmethod
+    def _find_job(session, job_id: str) -> Optional[ProcessingJob]:
+        # job_id is a unique secondary key (the primary key is the integer id),
+        # so session.get() cannot be used here.
+        return session.scalars(
+            select(ProcessingJob).where(ProcessingJob.job_id == uuid.UUID(job_id))
+        ).first()
+
     @staticmethod
     def create(metadata: Optional[Dict[str, Any]] = None) -> str:
         try:
             with get_db_session() as session:
-                job = ProcessingJob(status='pending_upload', started_at=datetime.now(UTC))
-                session.add(job)
-                session.flush()
-                job_id = str(job.job_id)
-                logger.info(f"Created processing job {job_id}")
+                job_id = str(session.execute(
+                    insert(ProcessingJob)
+                    .values(status='pending_upload', started_at=utc_now())
+                    .returning(ProcessingJob.job_id)
+                ).scalar_one())
+                logger.info("Created processing job %s", job_id)
                 return job_id
         except SQLAlchemyError as e:
-            logger.error(f"Error creating processing job: {e}")
+            logger.error("Error creating processing job: %s", e)
             raise
 
+    @staticmethod
+    def _invalidate(job_id: str) -> None:
+        invalidate("job", str(uuid.UUID(job_id)))
+
     @staticmethod
     def get_by_job_id(job_id: str) -> Optional[ProcessingJob]:
+        try:
+            key = cache_key("job", str(uuid.UUID(job_id)))
+        except ValueError:
+            logger.error("Invalid UUID format: %s", job_id)
+            return None
+        cached_job = get_json(key)
+        if cached_job is not None:
+            return model_from_cache(ProcessingJob, cached_job)
         try:
             with get_db_session() as session:
-                job = session.query(ProcessingJob).filter(
-                    ProcessingJob.job_id == uuid.UUID(job_id)
-                ).first()
+                job = ProcessingJobRepository._find_job(session, job_id)
                 if job:
                     session.expunge(job)
-                return job
-        except ValueError:
-            logger.error(f"Invalid UUID format: {job_id}")
-            return None
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching job {job_id}: {e}")
+            logger.error("Error fetching job %s: %s", job_id, e)
             raise
+        if job:
+            set_json(key, model_to_cache(job), JOB_CACHE_TTL)
+        return job
 
     @staticmethod
     def update_status(job_id: str, status: str, error_message: Optional[str] = None) -> bool:
         try:
+            values = {'status': status, 'updated_at': utc_now()}
+            if error_message:
+                values['error_message'] = error_message
+            if status == 'completed':
+                values['completed_at'] = utc_now()
             with get_db_session() as session:
-                job = session.query(ProcessingJob).filter(
-                    ProcessingJob.job_id == uuid.UUID(job_id)
-                ).first()
-                if not job:
-                    return False
-                job.status = status
-                job.updated_at = datetime.now(UTC)
-                if error_message:
-                    job.error_message = error_message
-                if status == 'completed':
-                    job.completed_at = datetime.now(UTC)
-                return True
+                result = session.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.job_id == uuid.UUID(job_id))
+                    .values(**values)
+                )
         except ValueError:
-            logger.error(f"Invalid UUID format: {job_id}")
+            logger.error("Invalid UUID format: %s", job_id)
             return False
         except SQLAlchemyError as e:
-            logger.error(f"Error updating job {job_id}: {e}")
+            logger.error("Error updating job %s: %s", job_id, e)
             raise
+        if not result.rowcount:
+            return False
+        ProcessingJobRepository._invalidate(job_id)
+        return True
 
     @staticmethod
     def update_s3_key(job_id: str, s3_key: str) -> bool:
         try:
             with get_db_session() as session:
-                job = session.query(ProcessingJob).filter(
-                    ProcessingJob.job_id == uuid.UUID(job_id)
-                ).first()
-                if not job:
-                    return False
-                job.s3_input_key = s3_key
-                job.status = 'uploaded'
-                job.updated_at = datetime.now(UTC)
-                return True
+                result = session.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.job_id == uuid.UUID(job_id))
+                    .values(s3_input_key=s3_key, status='uploaded', updated_at=utc_now())
+                )
         except ValueError:
-            logger.error(f"Invalid UUID format: {job_id}")
+            logger.error("Invalid UUID format: %s", job_id)
             return False
         except SQLAlchemyError as e:
-            logger.error(f"Error updating S3 key for job {job_id}: {e}")
+            logger.error("Error updating S3 key for job %s: %s", job_id, e)
             raise
+        if not result.rowcount:
+            return False
+        ProcessingJobRepository._invalidate(job_id)
+        return True
 
     @staticmethod
     def link_track(job_id: str, track_id: int) -> bool:
         try:
-            with get_db_session() as session:
-                job = session.query(ProcessingJob).filter(
-                    ProcessingJob.job_id == uuid.UUID(job_id)
-                ).first()
-                if not job:
-                    return False
-                job.track_id = track_id
-                job.updated_at = datetime.now(UTC)
-                return True
+            return ProcessingJobRepository.bulk_link_tracks([(job_id, track_id)]) > 0
         except ValueError:
-            logger.error(f"Invalid UUID format: {job_id}")
+            logger.error("Invalid UUID format: %s", job_id)
             return False
+
+    @staticmethod
+    def bulk_link_tracks(links: List[Tuple[str, int]]) -> int:
+        """Set track_id for many jobs in one UPDATE ... FROM (VALUES ...); returns rows updated."""
+        if not links:
+            return 0
+        # Validate up front so a malformed id raises ValueError rather than a DB error.
+        rows = [(str(uuid.UUID(job_id)), track_id) for job_id, track_id in links]
+        try:
+            with get_db_session() as session:
+                link_values = values(
+                    column('job_id', String), column('track_id', Integer), name='v'
+                ).data(rows)
+                result = session.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.job_id == cast(link_values.c.job_id, UUID(as_uuid=True)))
+                    .values(track_id=link_values.c.track_id, updated_at=utc_now())
+                )
+        except SQLAlchemyError as e:
+            logger.error("Error linking tracks to %s jobs: %s", len(links), e)
+            raise
+        for job_id, _ in rows:
+            invalidate("job", job_id)
+        return result.rowcount
+
+    @staticmethod
+    def finalize(job_id: str, track_id: int, track_updates: Dict[str, Any],
+                 features: Dict[str, Any], embedding_vector) -> None:
+        """Publish a processed track and complete its job in a single transaction.
+
+        Updates the track, stores its features and embedding, links the job
+        and marks it completed; either all of it commits or none of it does.
+        """
+        job_uuid = uuid.UUID(job_id)
+        try:
+            with get_db_session() as session:
+                session.execute(
+                    update(Track).where(Track.track_id == track_id)
+                    .values(updated_at=utc_now(), **track_updates)
+                )
+                session.execute(insert(AudioFeatures).values(track_id=track_id, **features))
+                session.execute(insert(TrackEmbedding).values(track_id=track_id, embedding_vector=embedding_vector))
+                session.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.job_id == job_uuid)
+                    .values(track_id=track_id, status='completed', completed_at=utc_now(), updated_at=utc_now())
+                )
         except SQLAlchemyError as e:
-            logger.error(f"Error linking track to job {job_id}: {e}")
+            logger.error("Error finalizing job %s for track %s: %s", job_id, track_id, e)
             raise
+        invalidate("track", track_id)
+        ProcessingJobRepository._invalidate(job_id)
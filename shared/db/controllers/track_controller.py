@@ -1,15 +1,32 @@
-from datetime import datetime, UTC
-from sqlalchemy import or_, desc
+from sqlalchemy import delete, or_, desc, func, insert, select, text, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from difflib import SequenceMatcher
 import logging
 
 from shared.db.models.tracks import Track
-from shared.db.database import get_db_session
+from shared.db.models.processing_jobs import ProcessingJob
+from shared.db.controllers.processing_job_controller import ProcessingJobRepository
+from shared.db.controllers.track_encryption_keys_controller import TrackEncryptionKeysRepository
+from shared.db.database import get_db_session, utc_now
+from shared.db.bulk import COPY_THRESHOLD, chunked, copy_rows
+from shared.util.cache import cache_key, get_json, set_json, invalidate, model_to_cache, model_from_cache
 
 logger = logging.getLogger(__name__)
 
+TRACK_CACHE_TTL = 3600
+TRACK_COUNT_CACHE_TTL = 60
+STREAM_BATCH_SIZE = 1000
+
+# Columns update() may write; the key and updated_at are managed here.
+_UPDATABLE_COLUMNS = frozenset(Track.__table__.columns.keys()) - {'track_id', 'updated_at'}
+
+# List endpoints select plain columns and serialise the rows, skipping ORM instances.
+_TRACK_COLUMNS = tuple(Track.__table__.columns)
+
+# Columns read by _search_score; candidates are ranked on these alone.
+_SEARCH_COLUMNS = (Track.track_id, Track.title, Track.artist_name, Track.genre_top, Track.listens)
+
 
 class TrackRepository:
 
@@ -65,62 +82,150 @@ class TrackRepository:
     def create(track_data: Dict[str, Any]) -> Optional[int]:
         try:
             with get_db_session() as session:
-                track = Track(**track_data)
-                session.add(track)
-                session.flush()
-                track_id = track.track_id
-                logger.info(f"Created track {track_id}: {track_data.get('title')}")
+                track_id = session.execute(
+                    insert(Track).values(**track_data).returning(Track.track_id)
+                ).scalar_one()
+                logger.info("Created track %s: %s", track_id, track_data.get('title'))
                 return track_id
         except IntegrityError as e:
-            logger.error(f"Integrity error creating track: {e}")
+            logger.error("Integrity error creating track: %s", e)
             raise
         except SQLAlchemyError as e:
-            logger.error(f"Database error creating track: {e}")
+            logger.error("Database error creating track: %s", e)
+            raise
+
+    @staticmethod
+    def bulk_create(tracks_data: List[Dict[str, Any]]) -> List[int]:
+        """Insert many tracks, skipping explicit track_ids that already exist; returns the new ids."""
+        if not tracks_data:
+            return []
+        try:
+            with get_db_session() as session:
+                explicit_ids = {row['track_id'] for row in tracks_data if row.get('track_id') is not None}
+                existing_ids = set()
+                for batch in chunked(explicit_ids):
+                    existing_ids.update(session.scalars(
+                        select(Track.track_id).where(Track.track_id.in_(batch))
+                    ))
+
+                rows, seen_ids = [], set()
+                for row in tracks_data:
+                    row_id = row.get('track_id')
+                    if row_id is not None:
+                        if row_id in existing_ids or row_id in seen_ids:
+                            continue
+                        seen_ids.add(row_id)
+                    rows.append(row)
+
+                # COPY cannot return generated ids, so it is only used when every id is explicit.
+                if len(rows) >= COPY_THRESHOLD and all(row.get('track_id') is not None for row in rows):
+                    copy_rows(session, Track, rows)
+                    track_ids = [row['track_id'] for row in rows]
+                else:
+                    track_ids = []
+                    for batch in chunked(rows):
+                        track_ids.extend(session.scalars(insert(Track).returning(Track.track_id), batch))
+                logger.info("Bulk created %s tracks (%s skipped)", len(track_ids), len(tracks_data) - len(rows))
+                return track_ids
+        except IntegrityError as e:
+            logger.error("Integrity error bulk creating tracks: %s", e)
+            raise
+        except SQLAlchemyError as e:
+            logger.error("Database error bulk creating tracks: %s", e)
             raise
 
     @staticmethod
     def get_by_id(track_id: int) -> Optional[Track]:
+        cached_track = get_json(cache_key("track", track_id))
+        if cached_track is not None:
+            return model_from_cache(Track, cached_track)
         try:
             with get_db_session() as session:
-                track = session.query(Track).filter(Track.track_id == track_id).first()
+                track = session.get(Track, track_id)
                 if track:
-                    _ = (track.track_id, track.title, track.artist_name, track.album_title,
-                         track.genre_top, track.duration_sec, track.cdn_url,
-                         track.created_at, track.updated_at)
                     session.expunge(track)
-                return track
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching track {track_id}: {e}")
+            logger.error("Error fetching track %s: %s", track_id, e)
             raise
+        if track:
+            set_json(cache_key("track", track_id), model_to_cache(track), TRACK_CACHE_TTL)
+        return track
 
     @staticmethod
-    def get_all(limit: int = 20, offset: int = 0) -> List[Track]:
+    def _page(stmt, limit: int, offset: int, after_id: Optional[int]):
+        """Order by track_id and page by keyset when ``after_id`` is given, else by offset."""
+        stmt = stmt.order_by(Track.track_id).limit(limit)
+        if after_id is not None:
+            return stmt.where(Track.track_id > after_id)
+        return stmt.offset(offset)
+
+    @staticmethod
+    def count(exact: bool = False) -> int:
+        """Number of tracks. By default the planner's estimate, cached briefly; ``exact=True`` runs COUNT(*)."""
+        key = cache_key("track_count")
+        if not exact:
+            cached_count = get_json(key)
+            if cached_count is not None:
+                return int(cached_count)
         try:
             with get_db_session() as session:
-                tracks = session.query(Track).offset(offset).limit(limit).all()
-                for track in tracks:
-                    session.expunge(track)
-                return tracks
+                total = None
+                if not exact:
+                    total = session.execute(
+                        text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'tracks'::regclass")
+                    ).scalar()
+                # reltuples is -1 until the table has been vacuumed or analyzed.
+                if total is None or total < 0:
+                    total = session.execute(select(func.count()).select_from(Track)).scalar_one()
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching tracks: {e}")
+            logger.error("Error counting tracks: %s", e)
             raise
+        set_json(key, int(total), TRACK_COUNT_CACHE_TTL)
+        return int(total)
 
     @staticmethod
-    def filter_by_genre(genre: str, limit: int = 20, offset: int = 0) -> List[Track]:
+    def get_all(limit: int = 20, offset: int = 0, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
         try:
             with get_db_session() as session:
-                tracks = session.query(Track).filter(
-                    Track.genre_top == genre
-                ).offset(offset).limit(limit).all()
-                for track in tracks:
-                    session.expunge(track)
-                return tracks
+                rows = session.execute(
+                    TrackRepository._page(select(*_TRACK_COLUMNS), limit, offset, after_id)
+                ).mappings()
+                return [Track.serialize(row) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error("Error fetching tracks: %s", e)
+            raise
+
+    @staticmethod
+    def iter_all(limit: Optional[int] = None, offset: int = 0) -> Iterator[Track]:
+        """Yield tracks through a server-side cursor, holding one batch in memory at a time."""
+        stmt = select(Track).order_by(Track.track_id).offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        try:
+            with get_db_session() as session:
+                yield from session.scalars(
+                    stmt.execution_options(yield_per=STREAM_BATCH_SIZE, stream_results=True)
+                )
+        except SQLAlchemyError as e:
+            logger.error("Error streaming tracks: %s", e)
+            raise
+
+    @staticmethod
+    def filter_by_genre(
+        genre: str, limit: int = 20, offset: int = 0, after_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        try:
+            with get_db_session() as session:
+                rows = session.execute(TrackRepository._page(
+                    select(*_TRACK_COLUMNS).where(Track.genre_top == genre), limit, offset, after_id
+                )).mappings()
+                return [Track.serialize(row) for row in rows]
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching tracks by genre {genre}: {e}")
+            logger.error("Error fetching tracks by genre %s: %s", genre, e)
             raise
 
     @staticmethod
-    def search(search_term: str, limit: int = 20) -> List[Track]:
+    def search(search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
         try:
             normalized_query = TrackRepository._normalize_text(search_term)
             if not normalized_query:
@@ -143,14 +248,14 @@ class TrackRepository:
                         Track.genre_top.ilike(f"%{token}%"),
                     ])
 
-                candidates = session.query(Track).filter(
+                candidates = session.query(*_SEARCH_COLUMNS).filter(
                     or_(*filters)
                 ).order_by(desc(Track.listens), desc(Track.track_id)).limit(candidate_limit).all()
 
                 # If strict token/substring matching found little, pull broader candidates
                 # and rely on fuzzy scoring to return likely typo matches.
                 if len(candidates) < limit:
-                    broader = session.query(Track).filter(
+                    broader = session.query(*_SEARCH_COLUMNS).filter(
                         or_(
                             Track.title.isnot(None),
                             Track.artist_name.isnot(None),
@@ -174,85 +279,104 @@ class TrackRepository:
                 )
 
                 min_score = 14.0
-                tracks = [
-                    track for track in ranked
+                top_ids = [
+                    track.track_id for track in ranked
                     if score_by_id.get(track.track_id, 0.0) >= min_score
                 ][:limit]
-
-                for track in tracks:
-                    session.expunge(track)
-                return tracks
+                if not top_ids:
+                    return []
+
+                # Full rows only for the winners, returned in ranked order.
+                tracks_by_id = {
+                    row['track_id']: Track.serialize(row)
+                    for row in session.execute(
+                        select(*_TRACK_COLUMNS).where(Track.track_id.in_(top_ids))
+                    ).mappings()
+                }
+                return [tracks_by_id[track_id] for track_id in top_ids if track_id in tracks_by_id]
         except SQLAlchemyError as e:
-            logger.error(f"Error searching tracks: {e}")
+            logger.error("Error searching tracks: %s", e)
             raise
 
     @staticmethod
     def update(track_id: int, update_data: Dict[str, Any]) -> bool:
+        values = {key: value for key, value in update_data.items() if key in _UPDATABLE_COLUMNS}
         try:
             with get_db_session() as session:
-                track = session.query(Track).filter(Track.track_id == track_id).first()
-                if not track:
-                    return False
-                for key, value in update_data.items():
-                    if hasattr(track, key):
-                        setattr(track, key, value)
-                track.updated_at = datetime.now(UTC)
-                return True
+                result = session.execute(
+                    update(Track).where(Track.track_id == track_id).values(updated_at=utc_now(), **values)
+                )
         except SQLAlchemyError as e:
-            logger.error(f"Error updating track {track_id}: {e}")
+            logger.error("Error updating track %s: %s", track_id, e)
             raise
+        if not result.rowcount:
+            return False
+        invalidate("track", track_id)
+        return True
 
     @staticmethod
     def delete(track_id: int) -> bool:
         try:
             with get_db_session() as session:
-                track = session.query(Track).filter(Track.track_id == track_id).first()
-                if not track:
+                # Jobs outlive their track, as when the ORM nulled the link on delete;
+                # features, embeddings and keys go with it via ON DELETE CASCADE.
+                job_ids = session.scalars(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.track_id == track_id)
+                    .values(track_id=None)
+                    .returning(ProcessingJob.job_id)
+                ).all()
+                result = session.execute(delete(Track).where(Track.track_id == track_id))
+                if not result.rowcount:
                     return False
-                session.delete(track)
-                logger.info(f"Deleted track {track_id}")
-                return True
+                logger.info("Deleted track %s", track_id)
         except SQLAlchemyError as e:
-            logger.error(f"Error deleting track {track_id}: {e}")
+            logger.error("Error deleting track %s: %s", track_id, e)
             raise
+        invalidate("track", track_id)
+        for job_id in job_ids:
+            ProcessingJobRepository._invalidate(str(job_id))
+        # The key row went with the track (ON DELETE CASCADE); stop serving it from cache.
+        TrackEncryptionKeysRepository.clear_key_cache(track_id)
+        return True
 
     @staticmethod
     def increment_play_metrics(track_id: int, listens_increment: int = 1, feature_score_increment: int = 1) -> bool:
         try:
             with get_db_session() as session:
-                track = session.query(Track).filter(Track.track_id == track_id).first()
-                if not track:
-                    return False
-                track.listens = (track.listens or 0) + max(0, listens_increment)
-                track.home_feature_score = (track.home_feature_score or 0) + max(0, feature_score_increment)
-                track.updated_at = datetime.now(UTC)
-                return True
+                result = session.execute(
+                    update(Track)
+                    .where(Track.track_id == track_id)
+                    .values(
+                        listens=func.coalesce(Track.listens, 0) + max(0, listens_increment),
+                        home_feature_score=func.coalesce(Track.home_feature_score, 0) + max(0, feature_score_increment),
+                        updated_at=utc_now(),
+                    )
+                )
         except SQLAlchemyError as e:
-            logger.error(f"Error incrementing play metrics for track {track_id}: {e}")
+            logger.error("Error incrementing play metrics for track %s: %s", track_id, e)
             raise
+        if not result.rowcount:
+            return False
+        invalidate("track", track_id)
+        return True
 
     @staticmethod
     def get_most_listened(limit: int = 10) -> List[Track]:
         try:
             with get_db_session() as session:
-                tracks = session.query(Track).order_by(desc(Track.listens)).limit(limit).all()
-                for track in tracks:
-                    session.expunge(track)
-                return tracks
+                return session.query(Track).order_by(desc(Track.listens)).limit(limit).all()
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching most listened tracks: {e}")
+            logger.error("Error fetching most listened tracks: %s", e)
             raise
 
     @staticmethod
     def get_featured_for_home(limit: int = 10) -> List[Track]:
         try:
             with get_db_session() as session:
-                tracks = session.query(Track).filter(
+                return session.query(Track).filter(
                     Track.is_featured_home == True  # noqa: E712
                 ).order_by(desc(Track.home_feature_score), desc(Track.listens)).limit(limit).all()
-                for track in tracks:
-                    session.expunge(track)
-                return tracks
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching featured home tracks: {e}")
+            logger.error("Error fetching featured home tracks: %s", e)
             raise
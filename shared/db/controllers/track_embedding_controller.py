@@ -1,10 +1,12 @@
+from sqlalchemy import insert, select, text, tuple_
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import Optional, List, Dict, Any, Tuple
 import logging
 
 from shared.db.models.track_embedding import TrackEmbedding
 from shared.db.models.tracks import Track
-from shared.db.database import get_db_session
+from shared.db.database import EMBEDDING_INDEX_DDL, engine, get_db_session
+from shared.db.bulk import COPY_THRESHOLD, chunked, copy_rows
 
 logger = logging.getLogger(__name__)
 
@@ -15,55 +17,140 @@ class TrackEmbeddingRepository:
     def create(embedding_data: Dict[str, Any]) -> Optional[int]:
         try:
             with get_db_session() as session:
-                embedding = TrackEmbedding(**embedding_data)
-                session.add(embedding)
-                session.flush()
-                return embedding.embedding_id
+                return session.execute(
+                    insert(TrackEmbedding).values(**embedding_data).returning(TrackEmbedding.embedding_id)
+                ).scalar_one()
         except IntegrityError as e:
-            logger.error(f"Integrity error creating embedding: {e}")
+            logger.error("Integrity error creating embedding: %s", e)
             raise
         except SQLAlchemyError as e:
-            logger.error(f"Database error creating embedding: {e}")
+            logger.error("Database error creating embedding: %s", e)
+            raise
+
+    @staticmethod
+    def bulk_create(embeddings_data: List[Dict[str, Any]]) -> int:
+        """Insert many embeddings, skipping (track_id, embedding_type) pairs already stored."""
+        if not embeddings_data:
+            return 0
+        try:
+            with get_db_session() as session:
+                def _pair(row):
+                    return row['track_id'], row.get('embedding_type') or 'audio_content'
+
+                pairs = {_pair(row) for row in embeddings_data}
+                existing = set()
+                for batch in chunked(pairs):
+                    existing.update(session.execute(
+                        select(TrackEmbedding.track_id, TrackEmbedding.embedding_type).where(
+                            tuple_(TrackEmbedding.track_id, TrackEmbedding.embedding_type).in_(batch)
+                        )
+                    ).tuples())
+
+                rows = []
+                for row in embeddings_data:
+                    pair = _pair(row)
+                    if pair in existing:
+                        continue
+                    existing.add(pair)
+                    rows.append(row)
+
+                if len(rows) >= COPY_THRESHOLD:
+                    copy_rows(session, TrackEmbedding, rows)
+                else:
+                    for batch in chunked(rows):
+                        session.execute(insert(TrackEmbedding), batch)
+                logger.info("Bulk created %s embeddings (%s skipped)", len(rows), len(embeddings_data) - len(rows))
+                return len(rows)
+        except IntegrityError as e:
+            logger.error("Integrity error bulk creating embeddings: %s", e)
+            raise
+        except SQLAlchemyError as e:
+            logger.error("Database error bulk creating embeddings: %s", e)
+            raise
+
+    @staticmethod
+    def bulk_load(embeddings_data: List[Dict[str, Any]]) -> int:
+        """COPY a large backfill with the HNSW index dropped, then rebuild it.
+
+        Unlike :meth:`bulk_create` nothing is deduplicated, and similarity
+        queries are blocked until the load commits, so this is meant for
+        reprocessing runs rather than live ingest.
+        """
+        if not embeddings_data:
+            return 0
+        try:
+            with get_db_session() as session:
+                session.execute(text("DROP INDEX IF EXISTS ix_embedding_vector_halfvec_cosine"))
+                loaded = copy_rows(session, TrackEmbedding, embeddings_data)
+            with engine.execution_options(isolation_level="AUTOCOMMIT").connect() as connection:
+                connection.execute(text(EMBEDDING_INDEX_DDL))
+            logger.info("Bulk loaded %s embeddings and rebuilt the similarity index", loaded)
+            return loaded
+        except IntegrityError as e:
+            logger.error("Integrity error bulk loading embeddings: %s", e)
+            raise
+        except SQLAlchemyError as e:
+            logger.error("Database error bulk loading embeddings: %s", e)
             raise
 
     @staticmethod
     def get_by_track_id(track_id: int) -> Optional[TrackEmbedding]:
         try:
             with get_db_session() as session:
-                embedding = session.query(TrackEmbedding).filter(
-                    TrackEmbedding.track_id == track_id
+                embedding = session.scalars(
+                    select(TrackEmbedding).where(TrackEmbedding.track_id == track_id)
                 ).first()
                 if embedding:
                     session.expunge(embedding)
                 return embedding
         except SQLAlchemyError as e:
-            logger.error(f"Error fetching embedding for track {track_id}: {e}")
+            logger.error("Error fetching embedding for track %s: %s", track_id, e)
             raise
 
     @staticmethod
-    def find_similar_tracks(track_id: int, limit: int = 10) -> List[Tuple[Track, float]]:
+    def get_track_with_embedding(track_id: int) -> Optional[Tuple[Track, Optional[TrackEmbedding]]]:
+        """Fetch a track and its embedding (None if not yet computed) in one query."""
         try:
             with get_db_session() as session:
-                target_embedding = session.query(TrackEmbedding).filter(
-                    TrackEmbedding.track_id == track_id
+                row = session.execute(
+                    select(Track, TrackEmbedding)
+                    .outerjoin(TrackEmbedding, Track.track_id == TrackEmbedding.track_id)
+                    .where(Track.track_id == track_id)
+                    .limit(1)
                 ).first()
-                if not target_embedding:
-                    return []
-                similar = session.query(
-                    Track,
-                    TrackEmbedding.embedding_vector.cosine_distance(
-                        target_embedding.embedding_vector
-                    ).label('distance')
-                ).join(
-                    TrackEmbedding, Track.track_id == TrackEmbedding.track_id
-                ).filter(
-                    Track.track_id != track_id
-                ).order_by('distance').limit(limit).all()
-                results = []
-                for track, distance in similar:
-                    session.expunge(track)
-                    results.append((track, float(distance)))
-                return results
+                return tuple(row) if row else None
+        except SQLAlchemyError as e:
+            logger.error("Error fetching track %s with embedding: %s", track_id, e)
+            raise
+
+    @staticmethod
+    def find_similar_tracks(track_id: int, limit: int = 10, include_embedding: bool = False) -> List[Tuple]:
+        """Nearest tracks as ``(track, distance)``, or ``(track, distance, vector)`` with ``include_embedding``."""
+        try:
+            with get_db_session() as session:
+                # correlate(None): the subquery must not bind to the outer track_embeddings row.
+                target_vector = select(TrackEmbedding.embedding_vector).where(
+                    TrackEmbedding.track_id == track_id
+                ).limit(1).correlate(None).scalar_subquery()
+                distance = TrackEmbedding.embedding_vector.cosine_distance(target_vector).label('distance')
+                # The HNSW scan returns at most ef_search candidates.
+                session.execute(text(f"SET LOCAL hnsw.ef_search = {max(40, int(limit) + 1)}"))
+                columns = [Track, distance]
+                if include_embedding:
+                    columns.append(TrackEmbedding.embedding_vector)
+                similar = session.execute(
+                    select(*columns)
+                    .join(TrackEmbedding, Track.track_id == TrackEmbedding.track_id)
+                    .where(Track.track_id != track_id)
+                    .order_by(distance)
+                    .limit(limit)
+                ).all()
+                # Without a target embedding every distance is NULL.
+                return [
+                    (row[0], float(row[1]), *row[2:])
+                    for row in similar
+                    if row[1] is not None
+                ]
         except SQLAlchemyError as e:
-            logger.error(f"Error finding similar tracks for track {track_id}: {e}")
+            logger.error("Error finding similar tracks for track %s: %s", track_id, e)
             raise
@@ -1,52 +1,164 @@
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
+from functools import lru_cache
 import logging
 import secrets
 
+import redis
+
 from shared.db.models.track_encryption_keys import TrackEncryptionKeys
 from shared.db.database import get_db_session
+from shared.db.bulk import chunked
+from shared.util.cache import cache_key, get_redis, invalidate
 
 logger = logging.getLogger(__name__)
 
+KEY_CACHE_TTL = 86400
+
+# Looked up on every stream key request; built once for the compiled cache.
+_KEY_BY_TRACK = select(TrackEncryptionKeys).where(TrackEncryptionKeys.track_id == bindparam('track_id'))
+_KEY_BYTES_BY_TRACK = (
+    select(TrackEncryptionKeys.encryption_key)
+    .where(TrackEncryptionKeys.track_id == bindparam('track_id'))
+    .limit(1)
+)
+
+
+def _cache_keys(keys: Dict[int, bytes]) -> None:
+    """Share keys with every API process through Redis; Postgres stays the source of truth."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for track_id, key in keys.items():
+            pipe.set(cache_key("hls_key", track_id), key, ex=KEY_CACHE_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Key cache write failed: %s", e)
+
+
+@lru_cache(maxsize=4096)
+def _cached_key_bytes(track_id: int) -> bytes:
+    # Keys never change once written. Raising on a miss keeps lru_cache from
+    # remembering "no key" for a track whose key is about to be created.
+    try:
+        key = get_redis().get(cache_key("hls_key", track_id))
+        if key is not None:
+            return key
+    except redis.RedisError as e:
+        logger.warning("Key cache read failed for track %s: %s", track_id, e)
+    try:
+        with get_db_session() as session:
+            key = session.scalar(_KEY_BYTES_BY_TRACK, {'track_id': track_id})
+    except SQLAlchemyError as e:
+        logger.error("Error fetching encryption key for track %s: %s", track_id, e)
+        raise
+    if key is None:
+        raise LookupError(track_id)
+    key = bytes(key)
+    _cache_keys({track_id: key})
+    return key
+
+
+def create_key(track_id: int, encryption_key: Optional[bytes] = None) -> Optional[int]:
+    try:
+        if encryption_key is None:
+            encryption_key = secrets.token_bytes(16)
+        elif len(encryption_key) != 16:
+            raise ValueError("Encryption key must be exactly 16 bytes")
+        with get_db_session() as session:
+            key_record = TrackEncryptionKeys(track_id=track_id, encryption_key=encryption_key)
+            session.add(key_record)
+            session.flush()
+            key_id = key_record.id
+    except IntegrityError as e:
+        logger.error("Integrity error creating encryption key: %s", e)
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error creating encryption key: %s", e)
+        raise
+    _cache_keys({track_id: encryption_key})
+    return key_id
+
+
+def create_keys(track_ids: List[int]) -> List[int]:
+    """Generate and store a fresh key per track in batched INSERTs within one transaction."""
+    if not track_ids:
+        return []
+    # One CSPRNG call for all keys, sliced into 16-byte AES-128 keys.
+    key_material = secrets.token_bytes(16 * len(track_ids))
+    rows = [
+        {'track_id': track_id, 'encryption_key': key_material[i * 16:(i + 1) * 16]}
+        for i, track_id in enumerate(track_ids)
+    ]
+    try:
+        with get_db_session() as session:
+            key_ids = []
+            for batch in chunked(rows):
+                key_ids.extend(session.scalars(
+                    insert(TrackEncryptionKeys).values(batch).returning(TrackEncryptionKeys.id)
+                ))
+            logger.info("Created encryption keys for %s tracks", len(key_ids))
+    except IntegrityError as e:
+        logger.error("Integrity error creating encryption keys: %s", e)
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error creating encryption keys: %s", e)
+        raise
+    _cache_keys({row['track_id']: row['encryption_key'] for row in rows})
+    return key_ids
 
-class TrackEncryptionKeysRepository:
 
-    @staticmethod
-    def create(track_id: int, encryption_key: Optional[bytes] = None) -> Optional[int]:
-        try:
-            if encryption_key is None:
-                encryption_key = secrets.token_bytes(16)
-            elif len(encryption_key) != 16:
-                raise ValueError("Encryption key must be exactly 16 bytes")
-            with get_db_session() as session:
-                key_record = TrackEncryptionKeys(track_id=track_id, encryption_key=encryption_key)
-                session.add(key_record)
-                session.flush()
-                return key_record.id
-        except IntegrityError as e:
-            logger.error(f"Integrity error creating encryption key: {e}")
-            raise
-        except SQLAlchemyError as e:
-            logger.error(f"Database error creating encryption key: {e}")
-            raise
-
-    @staticmethod
-    def get_by_track_id(track_id: int) -> Optional[TrackEncryptionKeys]:
-        try:
-            with get_db_session() as session:
-                key_record = session.query(TrackEncryptionKeys).filter(
-                    TrackEncryptionKeys.track_id == track_id
-                ).first()
-                if key_record:
-                    session.expunge(key_record)
-                return key_record
-        except SQLAlchemyError as e:
-            logger.error(f"Error fetching encryption key for track {track_id}: {e}")
-            raise
-
-    @staticmethod
-    def get_key_bytes(track_id: int) -> Optional[bytes]:
-        key_record = TrackEncryptionKeysRepository.get_by_track_id(track_id)
-        if key_record:
-            return key_record.get_key_bytes()
+def get_key_by_track_id(track_id: int) -> Optional[TrackEncryptionKeys]:
+    try:
+        with get_db_session() as session:
+            key_record = session.scalars(_KEY_BY_TRACK, {'track_id': track_id}).first()
+            if key_record:
+                session.expunge(key_record)
+            return key_record
+    except SQLAlchemyError as e:
+        logger.error("Error fetching encryption key for track %s: %s", track_id, e)
+        raise
+
+
+def get_key_bytes(track_id: int) -> Optional[bytes]:
+    try:
+        return _cached_key_bytes(track_id)
+    except LookupError:
         return None
+
+
+def clear_key_cache(track_id: Optional[int] = None) -> None:
+    """Drop this process's key cache, and the shared Redis entry for ``track_id`` if given."""
+    _cached_key_bytes.cache_clear()
+    if track_id is not None:
+        invalidate("hls_key", track_id)
+
+
+def get_keys_bulk(track_ids: Iterable[int]) -> Dict[int, bytes]:
+    """Key bytes for many tracks in one query per batch; tracks without a key are omitted."""
+    keys = {}
+    try:
+        with get_db_session() as session:
+            for batch in chunked(set(track_ids)):
+                keys.update(
+                    (track_id, bytes(key))
+                    for track_id, key in session.execute(
+                        select(TrackEncryptionKeys.track_id, TrackEncryptionKeys.encryption_key)
+                        .where(TrackEncryptionKeys.track_id.in_(batch))
+                    )
+                )
+    except SQLAlchemyError as e:
+        logger.error("Error fetching encryption keys in bulk: %s", e)
+        raise
+    return keys
+
+
+class TrackEncryptionKeysRepository:
+    """Namespace over the module-level functions, kept for existing callers."""
+
+    create = staticmethod(create_key)
+    create_many = staticmethod(create_keys)
+    get_by_track_id = staticmethod(get_key_by_track_id)
+    get_key_bytes = staticmethod(get_key_bytes)
+    clear_key_cache = staticmethod(clear_key_cache)
+    get_keys_bulk = staticmethod(get_keys_bulk)
@@ -1,7 +1,7 @@
 from typing import List, Dict, Any
 from uuid import UUID
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import desc
+from sqlalchemy import delete, desc, exists, select
 
 from shared.db.database import get_db_session
 from shared.db.models.track_like import TrackLike
@@ -10,14 +10,14 @@ from shared.db.models.tracks import Track
 
 class TrackLikeRepository:
 
+    @staticmethod
+    def _like_exists(user_id: UUID, track_id: int):
+        return exists().where(TrackLike.user_id == user_id, TrackLike.track_id == track_id)
+
     @staticmethod
     def like_track(user_id: UUID, track_id: int) -> bool:
         with get_db_session() as session:
-            existing = session.query(TrackLike).filter(
-                TrackLike.user_id == user_id,
-                TrackLike.track_id == track_id,
-            ).first()
-            if existing:
+            if session.scalar(select(TrackLikeRepository._like_exists(user_id, track_id))):
                 return False
             like = TrackLike(user_id=user_id, track_id=track_id)
             session.add(like)
@@ -26,22 +26,16 @@ class TrackLikeRepository:
     @staticmethod
     def unlike_track(user_id: UUID, track_id: int) -> bool:
         with get_db_session() as session:
-            row = session.query(TrackLike).filter(
+            result = session.execute(delete(TrackLike).where(
                 TrackLike.user_id == user_id,
                 TrackLike.track_id == track_id,
-            ).first()
-            if not row:
-                return False
-            session.delete(row)
-            return True
+            ))
+            return result.rowcount > 0
 
     @staticmethod
     def is_liked(user_id: UUID, track_id: int) -> bool:
         with get_db_session() as session:
-            return session.query(TrackLike).filter(
-                TrackLike.user_id == user_id,
-                TrackLike.track_id == track_id,
-            ).first() is not None
+            return session.scalar(select(TrackLikeRepository._like_exists(user_id, track_id)))
 
     @staticmethod
     def get_liked_tracks(user_id: UUID, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
@@ -53,7 +47,7 @@ class TrackLikeRepository:
             ).order_by(desc(TrackLike.created_at)).offset(offset).limit(limit).all()
             return [
                 {
-                    'liked_at': like.created_at.isoformat() if like.created_at else None,
+                    'liked_at': like.created_at,
                     'track': track.to_dict(),
                 }
                 for like, track in rows
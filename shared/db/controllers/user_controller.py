@@ -1,17 +1,52 @@
-from datetime import datetime, UTC
+from functools import lru_cache
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict, Iterable, Tuple
 import logging
+import secrets
+import threading
+import time
 from uuid import UUID
 
+from sqlalchemy import Row, bindparam, delete, exists, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from shared.db.models.user import User
 from shared.util.security import generate_hash_password, verify_password
-from shared.db.database import get_db_session
+from shared.db.database import get_db_session, utc_now
+from shared.db.bulk import chunked
 
 logger = logging.getLogger(__name__)
 
+# Reads return detached Core rows with every column except password_hash;
+# callers use attribute access, so they work as they did with User instances.
+_USER_COLUMNS = tuple(column for column in User.__table__.columns if column.key != 'password_hash')
+
+# Auth-path lookups are built once so every call hits SQLAlchemy's compiled cache.
+_USER_BY_ID = select(*_USER_COLUMNS).where(User.user_id == bindparam('user_id'))
+_USER_BY_EMAIL = select(*_USER_COLUMNS).where(User.email == bindparam('email'))
+_USER_BY_USERNAME = select(*_USER_COLUMNS).where(User.username == bindparam('username'))
+_EMAIL_EXISTS = select(exists().where(User.email == bindparam('email')))
+# Login needs only what goes into the token plus the hash to check.
+_CREDENTIALS_BY_EMAIL = select(
+    User.user_id, User.email, User.username, User.role, User.password_hash
+).where(User.email == bindparam('email'))
+
+
+# Every authenticated request resolves its token's user by id. Rows are
+# immutable, so a short per-process TTL cache can hand the same one out; writes
+# here drop the entry, other processes see changes within the TTL.
+USER_CACHE_TTL = 30.0
+USER_CACHE_MAX_SIZE = 10_000
+_user_cache: Dict[UUID, Tuple[float, Row]] = {}
+_user_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """Hash checked when there is no real one, so unknown emails cost as much as wrong passwords."""
+    return generate_hash_password(secrets.token_urlsafe(16))
+
 
 class UserCreate(BaseModel):
     email: str
@@ -25,119 +60,171 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
 
 
-class UserRepository:
+def _normalize_email(email: str) -> str:
+    return email.strip().lower()
 
-    @staticmethod
-    def _normalize_email(email: str) -> str:
-        return email.strip().lower()
 
-    @staticmethod
-    def _normalize_username(username: str) -> str:
-        return username.strip()
+def _normalize_username(username: str) -> str:
+    return username.strip()
 
-    @staticmethod
-    def _detach_user(user: User, session):
-        _ = user.user_id, user.email, user.username, user.role
-        _ = user.last_login_at, user.created_at, user.updated_at
-        session.expunge(user)
-        return user
 
-    @staticmethod
-    def create_user(data: UserCreate):
-        try:
-            with get_db_session() as session:
-                user = User(
-                    email=UserRepository._normalize_email(data.email),
-                    username=UserRepository._normalize_username(data.username),
-                    password_hash=generate_hash_password(data.password) if data.password else None,
+def create_user(data: UserCreate) -> Optional[UUID]:
+    """Insert a user and return its id, or None if the email is already registered."""
+    # Hash before checking out a connection; the KDF would otherwise hold it idle.
+    password_hash = generate_hash_password(data.password) if data.password else None
+    email = _normalize_email(data.email)
+    try:
+        with get_db_session() as session:
+            user_id = session.execute(
+                pg_insert(User)
+                .values(
+                    email=email,
+                    username=_normalize_username(data.username),
+                    password_hash=password_hash,
                 )
-                session.add(user)
-                session.flush()
-                user_id = user.user_id
-                logger.info(f"Created user {user_id}: {user.email}")
-                return user_id
-        except IntegrityError as e:
-            logger.error(f"Integrity error creating user: {e}")
-            raise
-        except SQLAlchemyError as e:
-            logger.error(f"Database error creating user: {e}")
-            raise
-
-    @staticmethod
-    def get_by_id(user_id: UUID) -> Optional[User]:
-        try:
-            with get_db_session() as session:
-                user = session.query(User).filter(User.user_id == user_id).first()
-                if user:
-                    return UserRepository._detach_user(user, session)
-                return user
-        except SQLAlchemyError as e:
-            logger.error(f"Error fetching user {user_id}: {e}")
-            raise
-
-    @staticmethod
-    def get_by_email(email: str) -> Optional[User]:
-        try:
-            with get_db_session() as session:
-                user = session.query(User).filter(User.email == UserRepository._normalize_email(email)).first()
-                if user:
-                    return UserRepository._detach_user(user, session)
-                return user
-        except SQLAlchemyError as e:
-            logger.error(f"Error fetching user by email {email}: {e}")
-            raise
-
-    @staticmethod
-    def get_by_username(username: str) -> Optional[User]:
-        try:
-            with get_db_session() as session:
-                user = session.query(User).filter(User.username == UserRepository._normalize_username(username)).first()
-                if user:
-                    return UserRepository._detach_user(user, session)
-                return user
-        except SQLAlchemyError as e:
-            logger.error(f"Error fetching user by username {username}: {e}")
-            raise
-
-    @staticmethod
-    def verify_credentials(email: str, password: str) -> Optional[User]:
-        try:
-            with get_db_session() as session:
-                user = session.query(User).filter(User.email == UserRepository._normalize_email(email)).first()
-                if not user:
-                    return None
-                if not verify_password(password, str(user.password_hash) if user.password_hash else ""):
-                    return None
-                return UserRepository._detach_user(user, session)
-        except Exception as e:
-            logger.error(f"Error verifying credentials for {email}: {e}")
-            raise
-
-    @staticmethod
-    def update_last_login(user_id: UUID) -> bool:
-        try:
-            with get_db_session() as session:
-                user = session.query(User).filter(User.user_id == user_id).first()
-                if not user:
-                    return False
-                user.last_login_at = datetime.now(UTC)
-                session.flush()
-                return True
-        except SQLAlchemyError as e:
-            logger.error(f"Error updating last login for user {user_id}: {e}")
-            raise
-
-    @staticmethod
-    def delete_user(user_id: UUID) -> bool:
-        try:
-            with get_db_session() as session:
-                user = session.query(User).filter(User.user_id == user_id).first()
-                if not user:
-                    return False
-                session.delete(user)
-                session.flush()
-                logger.info(f"Deleted user {user_id}")
-                return True
-        except SQLAlchemyError as e:
-            logger.error(f"Error deleting user {user_id}: {e}")
-            raise
+                .on_conflict_do_nothing(index_elements=['email'])
+                .returning(User.user_id)
+            ).scalar()
+        if user_id is None:
+            logger.info("User with email %s already exists", email)
+            return None
+        logger.info("Created user %s: %s", user_id, email)
+        return user_id
+    except IntegrityError as e:
+        logger.error("Integrity error creating user: %s", e)
+        raise
+    except SQLAlchemyError as e:
+        logger.error("Database error creating user: %s", e)
+        raise
+
+
+def get_user_by_id(user_id: UUID) -> Optional[Row]:
+    now = time.monotonic()
+    cached = _user_cache.get(user_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    try:
+        with get_db_session() as session:
+            user = session.execute(_USER_BY_ID, {'user_id': user_id}).first()
+    except SQLAlchemyError as e:
+        logger.error("Error fetching user %s: %s", user_id, e)
+        raise
+    if user is not None:
+        with _user_cache_lock:
+            if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+                _user_cache.pop(next(iter(_user_cache)))
+            _user_cache[user_id] = (now + USER_CACHE_TTL, user)
+    return user
+
+
+def clear_user_cache(user_id: Optional[UUID] = None) -> None:
+    """Drop one cached user, or all of them when ``user_id`` is None."""
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(user_id, None)
+
+
+def get_users_by_ids(user_ids: Iterable[UUID]) -> Dict[UUID, Row]:
+    """User rows keyed by id; unknown ids are omitted."""
+    try:
+        with get_db_session() as session:
+            users = {}
+            for batch in chunked(set(user_ids)):
+                for user in session.execute(select(*_USER_COLUMNS).where(User.user_id.in_(batch))):
+                    users[user.user_id] = user
+            return users
+    except SQLAlchemyError as e:
+        logger.error("Error fetching users by ids: %s", e)
+        raise
+
+
+def get_user_by_email(email: str) -> Optional[Row]:
+    try:
+        with get_db_session() as session:
+            return session.execute(_USER_BY_EMAIL, {'email': _normalize_email(email)}).first()
+    except SQLAlchemyError as e:
+        logger.error("Error fetching user by email %s: %s", email, e)
+        raise
+
+
+def email_exists(email: str) -> bool:
+    try:
+        with get_db_session() as session:
+            return session.scalar(_EMAIL_EXISTS, {'email': _normalize_email(email)})
+    except SQLAlchemyError as e:
+        logger.error("Error checking email %s: %s", email, e)
+        raise
+
+
+def get_user_by_username(username: str) -> Optional[Row]:
+    try:
+        with get_db_session() as session:
+            return session.execute(
+                _USER_BY_USERNAME, {'username': _normalize_username(username)}
+            ).first()
+    except SQLAlchemyError as e:
+        logger.error("Error fetching user by username %s: %s", username, e)
+        raise
+
+
+def verify_credentials(email: str, password: str) -> Optional[Row]:
+    """Return ``(user_id, email, username, role, password_hash)`` for valid credentials, else None."""
+    try:
+        with get_db_session() as session:
+            user = session.execute(
+                _CREDENTIALS_BY_EMAIL, {'email': _normalize_email(email)}
+            ).first()
+        # Verified after the connection is returned to the pool.
+        if not user or not user.password_hash:
+            verify_password(password, _dummy_password_hash())
+            return None
+        if not verify_password(password, str(user.password_hash)):
+            return None
+        return user
+    except Exception as e:
+        logger.error("Error verifying credentials for %s: %s", email, e)
+        raise
+
+
+def update_last_login(user_id: UUID) -> bool:
+    try:
+        with get_db_session() as session:
+            result = session.execute(
+                update(User).where(User.user_id == user_id).values(last_login_at=utc_now())
+            )
+        clear_user_cache(user_id)
+        return result.rowcount > 0
+    except SQLAlchemyError as e:
+        logger.error("Error updating last login for user %s: %s", user_id, e)
+        raise
+
+
+def delete_user(user_id: UUID) -> bool:
+    try:
+        with get_db_session() as session:
+            result = session.execute(delete(User).where(User.user_id == user_id))
+        clear_user_cache(user_id)
+        if not result.rowcount:
+            return False
+        logger.info("Deleted user %s", user_id)
+        return True
+    except SQLAlchemyError as e:
+        logger.error("Error deleting user %s: %s", user_id, e)
+        raise
+
+
+class UserRepository:
+    """Namespace over the module-level functions, kept for existing callers."""
+
+    create_user = staticmethod(create_user)
+    get_by_id = staticmethod(get_user_by_id)
+    get_many_by_ids = staticmethod(get_users_by_ids)
+    get_by_email = staticmethod(get_user_by_email)
+    email_exists = staticmethod(email_exists)
+    get_by_username = staticmethod(get_user_by_username)
+    verify_credentials = staticmethod(verify_credentials)
+    update_last_login = staticmethod(update_last_login)
+    delete_user = staticmethod(delete_user)
+    clear_cache = staticmethod(clear_user_cache)
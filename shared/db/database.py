@@ -1,26 +1,38 @@
 import os
 from contextlib import contextmanager
-from sqlalchemy import create_engine, text
+from functools import wraps
+from sqlalchemy import create_engine, func, text
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.pool import QueuePool
-from dotenv import load_dotenv
+from shared.config import load_env
 import logging
 
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+load_env()
 
 DATABASE_URL = os.getenv('DATABASE_URL')
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not set")
 
+# Per-process pool; size it so processes x (pool + overflow) stays under the
+# server's (or PgBouncer's) connection limit.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+# Seconds before a new connection attempt gives up, instead of waiting on the
+# OS TCP timeout while the server is unreachable.
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+
 engine = create_engine(
     DATABASE_URL,
     poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     pool_pre_ping=True,
-    pool_recycle=3600,
+    pool_use_lifo=True,
+    pool_recycle=1800,
+    executemany_mode="values_plus_batch",
+    connect_args={"connect_timeout": DB_CONNECT_TIMEOUT},
     echo=False,
     future=True
 )
@@ -44,19 +56,144 @@ def get_db_session():
         session.commit()
     except Exception as e:
         session.rollback()
-        logger.error(f"Database session error: {e}")
+        logger.error("Database session error: %s", e)
         raise
     finally:
         session.close()
 
 
+def with_session(func):
+    """Supply a managed session as the ``session`` keyword unless the caller already passed one."""
+    @wraps(func)
+    def wrapper(*args, session=None, **kwargs):
+        if session is not None:
+            return func(*args, session=session, **kwargs)
+        with get_db_session() as managed_session:
+            return func(*args, session=managed_session, **kwargs)
+    return wrapper
+
+
+def utc_now():
+    """Server-side UTC timestamp for the naive ``DateTime`` columns, evaluated by Postgres."""
+    return func.timezone('utc', func.now())
+
+
 def create_tables():
-    Base.metadata.create_all(engine)
-    _run_lightweight_migrations()
+    # Table creation and the required migrations share one transaction, so a
+    # failed step leaves the schema as it was.
+    with engine.begin() as connection:
+        Base.metadata.create_all(connection)
+        _run_lightweight_migrations(connection)
+    _run_optional_migrations()
     logger.info("Database tables created")
 
 
-def _run_lightweight_migrations():
+# Naive UTC timestamp columns stamped by Postgres on insert.
+_UTC_TIMESTAMP_DEFAULTS = (
+    ('tracks', 'created_at'), ('tracks', 'updated_at'),
+    ('audio_features', 'created_at'),
+    ('track_embeddings', 'created_at'),
+    ('track_encryption_keys', 'created_at'),
+    ('processing_jobs', 'started_at'), ('processing_jobs', 'created_at'), ('processing_jobs', 'updated_at'),
+    ('users', 'created_at'), ('users', 'updated_at'),
+    ('banners', 'created_at'), ('banners', 'updated_at'),
+    ('admin_curated_tracks', 'created_at'), ('admin_curated_tracks', 'updated_at'),
+    ('track_likes', 'created_at'),
+    ('playlists', 'created_at'), ('playlists', 'updated_at'),
+    ('playlist_tracks', 'added_at'),
+)
+
+# Converts a float32 ``vector`` embedding column to ``halfvec`` in place. The
+# indexes built on the old column are dropped first; the halfvec HNSW index is
+# recreated by the optional migrations.
+_EMBEDDING_HALFVEC_MIGRATION = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'track_embeddings'
+          AND column_name = 'embedding_vector'
+          AND udt_name = 'vector'
+    ) THEN
+        DROP INDEX IF EXISTS ix_embedding_vector_halfvec_cosine;
+        DROP INDEX IF EXISTS ix_embedding_vector_cosine;
+        ALTER TABLE track_embeddings
+            ALTER COLUMN embedding_vector TYPE halfvec(40) USING embedding_vector::halfvec(40);
+    END IF;
+END
+$$
+"""
+
+EMBEDDING_INDEX_DDL = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_embedding_vector_halfvec_cosine "
+    "ON track_embeddings USING hnsw (embedding_vector halfvec_cosine_ops) "
+    "WITH (m = 16, ef_construction = 64)"
+)
+
+_DROP_INVALID_EMBEDDING_INDEX = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = 'ix_embedding_vector_halfvec_cosine' AND NOT i.indisvalid
+    ) THEN
+        DROP INDEX ix_embedding_vector_halfvec_cosine;
+    END IF;
+END
+$$
+"""
+
+
+# Daily quota totals are maintained from user_listening_history writes: a new
+# row counts a started track, duration growth adds minutes and the first
+# transition to completed counts a completed track. UPDATE-then-INSERT (with a
+# retry on unique_violation) does not depend on the optional unique indexes.
+_QUOTA_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_daily_listen_quota() RETURNS trigger AS $$
+DECLARE
+    day_start timestamptz := date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    minutes_delta double precision := 0;
+    started_delta integer := 0;
+    completed_delta integer := 0;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        started_delta := 1;
+    ELSE
+        minutes_delta := GREATEST(COALESCE(NEW.duration_listened, 0) - COALESCE(OLD.duration_listened, 0), 0) / 60.0;
+        IF COALESCE(NEW.completed, FALSE) AND NOT COALESCE(OLD.completed, FALSE) THEN
+            completed_delta := 1;
+        END IF;
+        IF minutes_delta = 0 AND completed_delta = 0 THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    LOOP
+        UPDATE daily_listen_quota
+        SET minutes_listened = COALESCE(minutes_listened, 0) + minutes_delta,
+            tracks_started = COALESCE(tracks_started, 0) + started_delta,
+            tracks_completed = COALESCE(tracks_completed, 0) + completed_delta
+        WHERE date = day_start
+          AND ((NEW.user_id IS NOT NULL AND user_id = NEW.user_id)
+               OR (NEW.user_id IS NULL AND user_id IS NULL AND ip_address = NEW.ip_address));
+        IF FOUND THEN
+            RETURN NULL;
+        END IF;
+        BEGIN
+            INSERT INTO daily_listen_quota
+                (user_id, ip_address, date, minutes_listened, tracks_started, tracks_completed)
+            VALUES (NEW.user_id, NEW.ip_address, day_start, minutes_delta, started_delta, completed_delta);
+            RETURN NULL;
+        EXCEPTION WHEN unique_violation THEN
+            -- A concurrent play created today's row first; loop back to the UPDATE.
+        END;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _run_lightweight_migrations(connection):
     """Apply small additive schema updates for environments without migrations."""
     statements = [
         "ALTER TABLE tracks ADD COLUMN IF NOT EXISTS is_featured_home BOOLEAN NOT NULL DEFAULT FALSE",
@@ -111,7 +248,64 @@ def _run_lightweight_migrations():
             "ADD CONSTRAINT user_listening_history_track_id_fkey "
             "FOREIGN KEY (track_id) REFERENCES tracks(track_id) ON DELETE CASCADE"
         ),
+        _EMBEDDING_HALFVEC_MIGRATION,
+        _QUOTA_TRIGGER_FUNCTION,
+        "DROP TRIGGER IF EXISTS trg_listening_history_quota ON user_listening_history",
+        (
+            "CREATE TRIGGER trg_listening_history_quota "
+            "AFTER INSERT OR UPDATE OF duration_listened, completed ON user_listening_history "
+            "FOR EACH ROW EXECUTE FUNCTION bump_daily_listen_quota()"
+        ),
     ]
-    with engine.begin() as connection:
-        for statement in statements:
-            connection.execute(text(statement))
+    statements += [
+        f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT timezone('utc', now())"
+        for table, column in _UTC_TIMESTAMP_DEFAULTS
+    ]
+    statements.append("ALTER TABLE user_listening_history ALTER COLUMN started_at SET DEFAULT now()")
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def _run_optional_migrations():
+    """Apply index additions one at a time; a failure (e.g. legacy duplicate rows) is logged, not fatal."""
+    statements = [
+        (
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_daily_listen_quota_user_date "
+            "ON daily_listen_quota (user_id, date)"
+        ),
+        (
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_daily_listen_quota_ip_date "
+            "ON daily_listen_quota (ip_address, date) WHERE user_id IS NULL"
+        ),
+        (
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ulh_user_started "
+            "ON user_listening_history (user_id, started_at) "
+            "INCLUDE (track_id, duration_listened, completed)"
+        ),
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ulh_track ON user_listening_history (track_id)",
+        # An interrupted concurrent build leaves an invalid index behind that
+        # IF NOT EXISTS would keep forever; drop it so the build is retried.
+        _DROP_INVALID_EMBEDDING_INDEX,
+        EMBEDDING_INDEX_DDL,
+        "DROP INDEX IF EXISTS ix_embedding_vector_cosine",
+        # Trigram indexes let the ILIKE '%term%' filters in track search use an index scan.
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_tracks_title_trgm ON tracks USING gin (title gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_tracks_artist_name_trgm ON tracks USING gin (artist_name gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_tracks_genre_top_trgm ON tracks USING gin (genre_top gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_tracks_genre_top_track_id ON tracks (genre_top, track_id)",
+        # Each connection reserves 50 ids at a time, so batched inserts rarely hit the sequence.
+        "ALTER SEQUENCE IF EXISTS tracks_track_id_seq CACHE 50",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_track_encryption_keys_track_id "
+            "ON track_encryption_keys (track_id) INCLUDE (encryption_key)"
+        ),
+    ]
+    # Autocommit so CREATE INDEX CONCURRENTLY can run; each statement commits on its own.
+    autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+    for statement in statements:
+        try:
+            with autocommit_engine.connect() as connection:
+                connection.execute(text(statement))
+        except Exception as e:
+            logger.warning("Skipped optional migration (%s): %s", statement, e)
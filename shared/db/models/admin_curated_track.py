@@ -1,6 +1,5 @@
-from datetime import datetime, UTC
-from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, UniqueConstraint
-from shared.db.database import Base
+from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, UniqueConstraint, text
+from shared.db.database import Base, utc_now
 
 
 class AdminCuratedTrack(Base):
@@ -10,8 +9,8 @@ class AdminCuratedTrack(Base):
     track_id = Column(Integer, ForeignKey('tracks.track_id', ondelete='CASCADE'), nullable=False)
     display_order = Column(Integer, default=0, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
+    updated_at = Column(DateTime, server_default=text("timezone('utc', now())"), onupdate=utc_now())
 
     __table_args__ = (
         UniqueConstraint('track_id', name='uq_admin_curated_track_track_id'),
@@ -23,6 +22,6 @@ class AdminCuratedTrack(Base):
             'track_id': self.track_id,
             'display_order': self.display_order,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
         }
@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
-from datetime import datetime, UTC
+from operator import attrgetter
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, text
 from sqlalchemy.orm import relationship
 from shared.db.database import Base
 
+_DICT_KEYS = (
+    'feature_id', 'track_id', 'spectral_centroid', 'spectral_rolloff', 'spectral_bandwidth',
+    'tempo', 'beat_strength', 'zcr_mean', 'rms_mean', 'created_at',
+)
+_get_dict_values = attrgetter(*_DICT_KEYS)
+
 
 class AudioFeatures(Base):
     __tablename__ = 'audio_features'
@@ -76,20 +82,10 @@ class AudioFeatures(Base):
     zcr_var = Column(Float)
     rms_var = Column(Float)
 
-    created_at = Column(DateTime, default=datetime.now(UTC))
+    # Filled by Postgres at insert time; a Python default here would be evaluated once at import.
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
 
-    track = relationship("Track", back_populates="audio_features")
+    track = relationship("Track", back_populates="audio_features", lazy="raise")
 
     def to_dict(self):
-        return {
-            'feature_id': self.feature_id,
-            'track_id': self.track_id,
-            'spectral_centroid': self.spectral_centroid,
-            'spectral_rolloff': self.spectral_rolloff,
-            'spectral_bandwidth': self.spectral_bandwidth,
-            'tempo': self.tempo,
-            'beat_strength': self.beat_strength,
-            'zcr_mean': self.zcr_mean,
-            'rms_mean': self.rms_mean,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return dict(zip(_DICT_KEYS, _get_dict_values(self)))
@@ -1,6 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
-from datetime import datetime, UTC
-from shared.db.database import Base
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, text
+from shared.db.database import Base, utc_now
 
 
 class Banner(Base):
@@ -14,8 +13,8 @@ class Banner(Base):
     link_url = Column(String(500), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     display_order = Column(Integer, default=0, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
+    updated_at = Column(DateTime, server_default=text("timezone('utc', now())"), onupdate=utc_now())
 
     def to_dict(self):
         return {
@@ -26,6 +25,6 @@ class Banner(Base):
             'link_url': self.link_url,
             'is_active': self.is_active,
             'display_order': self.display_order,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
         }
@@ -1,6 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Index, text, func
 from sqlalchemy.dialects.postgresql import UUID
-from datetime import datetime, UTC
 from shared.db.database import Base
 
 
@@ -10,17 +9,25 @@ class UserListeningHistory(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=True)
     track_id = Column(Integer, ForeignKey("tracks.track_id", ondelete="CASCADE"), nullable=False)
-    started_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     duration_listened = Column(Float, default=0.0)
     completed = Column(Boolean, default=False)
     ip_address = Column(String(45), nullable=False)
 
+    # Per-user reads (history, stats, top tracks) only touch these columns, so
+    # the INCLUDE list lets them run as index-only scans.
+    __table_args__ = (
+        Index('ix_ulh_user_started', 'user_id', 'started_at',
+              postgresql_include=['track_id', 'duration_listened', 'completed']),
+        Index('ix_ulh_track', 'track_id'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
             "user_id": str(self.user_id) if self.user_id else None,
             "track_id": self.track_id,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "started_at": self.started_at,
             "duration_listened": self.duration_listened,
             "completed": self.completed,
             "ip_address": self.ip_address
@@ -37,3 +44,9 @@ class DailyListenQuota(Base):
     tracks_started = Column(Integer, default=0)
     tracks_completed = Column(Integer, default=0)
     ip_address = Column(String(45), nullable=True)
+
+    __table_args__ = (
+        Index('ux_daily_listen_quota_user_date', 'user_id', 'date', unique=True),
+        Index('ux_daily_listen_quota_ip_date', 'ip_address', 'date', unique=True,
+              postgresql_where=text('user_id IS NULL')),
+    )
@@ -1,8 +1,7 @@
 import uuid
-from datetime import datetime, UTC
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
-from shared.db.database import Base
+from shared.db.database import Base, utc_now
 
 
 class Playlist(Base):
@@ -13,8 +12,8 @@ class Playlist(Base):
     name = Column(String(120), nullable=False)
     description = Column(String(500), nullable=True)
     is_public = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
+    updated_at = Column(DateTime, server_default=text("timezone('utc', now())"), onupdate=utc_now())
 
     def to_dict(self):
         return {
@@ -23,8 +22,8 @@ class Playlist(Base):
             'name': self.name,
             'description': self.description,
             'is_public': self.is_public,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
         }
 
 
@@ -35,7 +34,7 @@ class PlaylistTrack(Base):
     playlist_id = Column(UUID(as_uuid=True), ForeignKey('playlists.playlist_id', ondelete='CASCADE'), nullable=False, index=True)
     track_id = Column(Integer, ForeignKey('tracks.track_id', ondelete='CASCADE'), nullable=False, index=True)
     position = Column(Integer, default=0, nullable=False)
-    added_at = Column(DateTime, default=datetime.now(UTC))
+    added_at = Column(DateTime, server_default=text("timezone('utc', now())"))
 
     __table_args__ = (
         UniqueConstraint('playlist_id', 'track_id', name='uq_playlist_track_pair'),
@@ -47,5 +46,5 @@ class PlaylistTrack(Base):
             'playlist_id': str(self.playlist_id),
             'track_id': self.track_id,
             'position': self.position,
-            'added_at': self.added_at.isoformat() if self.added_at else None,
+            'added_at': self.added_at,
         }
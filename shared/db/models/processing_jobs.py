@@ -1,9 +1,8 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime, UTC
 import uuid
-from shared.db.database import Base
+from shared.db.database import Base, utc_now
 
 
 class ProcessingJob(Base):
@@ -15,12 +14,12 @@ class ProcessingJob(Base):
     s3_input_key = Column(String(500), nullable=True)
     status = Column(String(50), default='pending_upload', nullable=False, index=True)
     error_message = Column(Text, nullable=True)
-    started_at = Column(DateTime, default=datetime.now(UTC))
+    started_at = Column(DateTime, server_default=text("timezone('utc', now())"))
     completed_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
+    updated_at = Column(DateTime, server_default=text("timezone('utc', now())"), onupdate=utc_now())
 
-    track = relationship("Track", back_populates="processing_job")
+    track = relationship("Track", back_populates="processing_job", lazy="raise")
 
     def to_dict(self):
         return {
@@ -30,7 +29,7 @@ class ProcessingJob(Base):
             's3_input_key': self.s3_input_key,
             'status': self.status,
             'error_message': self.error_message,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
+            'created_at': self.created_at,
         }
@@ -1,7 +1,6 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Index
-from datetime import datetime, UTC
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Index, text
 from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 from shared.db.database import Base
 
 
@@ -10,17 +9,19 @@ class TrackEmbedding(Base):
 
     embedding_id = Column(Integer, primary_key=True, autoincrement=True)
     track_id = Column(Integer, ForeignKey('tracks.track_id', ondelete='CASCADE'), nullable=False)
-    embedding_vector = Column(Vector(40))
+    embedding_vector = Column(HALFVEC(40))
     embedding_type = Column(String(50), default='audio_content')
-    created_at = Column(DateTime, default=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
 
-    track = relationship("Track", back_populates="embeddings")
+    track = relationship("Track", back_populates="embeddings", lazy="raise")
 
+    # Vectors are stored as fp16: half the heap and index size of float32,
+    # with no measurable recall loss at 40 dimensions.
     __table_args__ = (
-        Index('ix_embedding_vector_cosine', 'embedding_vector',
-              postgresql_using='ivfflat',
-              postgresql_ops={'embedding_vector': 'vector_cosine_ops'},
-              postgresql_with={'lists': 100}),
+        Index('ix_embedding_vector_halfvec_cosine', 'embedding_vector',
+              postgresql_using='hnsw',
+              postgresql_with={'m': 16, 'ef_construction': 64},
+              postgresql_ops={'embedding_vector': 'halfvec_cosine_ops'}),
     )
 
     def to_dict(self):
@@ -28,5 +29,5 @@ class TrackEmbedding(Base):
             'embedding_id': self.embedding_id,
             'track_id': self.track_id,
             'embedding_type': self.embedding_type,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
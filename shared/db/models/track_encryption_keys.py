@@ -1,5 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, DateTime
-from datetime import datetime, UTC
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from shared.db.database import Base
 
@@ -10,9 +9,14 @@ class TrackEncryptionKeys(Base):
     id = Column(Integer, primary_key=True)
     track_id = Column(Integer, ForeignKey('tracks.track_id', ondelete='CASCADE'), nullable=False)
     encryption_key = Column(LargeBinary(16), nullable=False)
-    created_at = Column(DateTime, default=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
 
-    track = relationship('Track', back_populates="encryption_keys")
+    track = relationship('Track', back_populates="encryption_keys", lazy="raise")
+
+    __table_args__ = (
+        # Covers the per-stream key lookup so it never touches the heap.
+        Index('ix_track_encryption_keys_track_id', 'track_id', postgresql_include=['encryption_key']),
+    )
 
     def get_key_bytes(self) -> bytes:
         return bytes(self.encryption_key)
@@ -21,5 +25,5 @@ class TrackEncryptionKeys(Base):
         return {
             'id': self.id,
             'track_id': self.track_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
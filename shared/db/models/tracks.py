@@ -1,13 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
-from datetime import datetime, UTC
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, Index, text
 from sqlalchemy.orm import relationship
-from shared.db.database import Base
+from shared.db.database import Base, utc_now
 
 
 class Track(Base):
     __tablename__ = 'tracks'
 
-    track_id = Column(Integer, primary_key=True)
+    track_id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(500))
     artist_name = Column(String(500))
     album_title = Column(String(500))
@@ -23,13 +22,29 @@ class Track(Base):
     home_feature_score = Column(Integer, default=0, nullable=False, index=True)
     date_created = Column(String(50))
     processing_status = Column(String(50), default='success')
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
+    updated_at = Column(DateTime, server_default=text("timezone('utc', now())"), onupdate=utc_now())
 
-    audio_features = relationship("AudioFeatures", back_populates="track", uselist=False, cascade="all, delete-orphan")
-    embeddings = relationship("TrackEmbedding", back_populates="track", cascade="all, delete-orphan")
-    processing_job = relationship("ProcessingJob", back_populates="track", uselist=False)
-    encryption_keys = relationship("TrackEncryptionKeys", back_populates="track", uselist=False, cascade="all, delete-orphan")
+    # Relationships are never lazy-loaded: an accidental per-row access raises
+    # instead of issuing a query per track. Child rows are removed by the
+    # database's ON DELETE CASCADE rather than loaded by the ORM first.
+    audio_features = relationship("AudioFeatures", back_populates="track", uselist=False, lazy="raise",
+                                  cascade="all, delete-orphan", passive_deletes=True)
+    embeddings = relationship("TrackEmbedding", back_populates="track", lazy="raise",
+                              cascade="all, delete-orphan", passive_deletes=True)
+    processing_job = relationship("ProcessingJob", back_populates="track", uselist=False, lazy="raise")
+    encryption_keys = relationship("TrackEncryptionKeys", back_populates="track", uselist=False, lazy="raise",
+                                   cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Serves genre listings paged by track_id.
+        Index('ix_tracks_genre_top_track_id', 'genre_top', 'track_id'),
+    )
+
+    @staticmethod
+    def serialize(row) -> dict:
+        """Same shape as :meth:`to_dict` for a Core row mapping of the table's columns."""
+        return dict(row)
 
     def to_dict(self):
         return {
@@ -49,6 +64,6 @@ class Track(Base):
             'home_feature_score': self.home_feature_score,
             'date_created': self.date_created,
             'processing_status': self.processing_status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
@@ -1,9 +1,8 @@
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
-from datetime import datetime, UTC
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from enum import Enum
-from shared.db.database import Base
+from shared.db.database import Base, utc_now
 
 
 class UserRole(str, Enum):
@@ -20,8 +19,8 @@ class User(Base):
     password_hash = Column(String(255), nullable=True)
     role = Column(SQLEnum(UserRole, name="user_role"), nullable=False, default=UserRole.USER)
     last_login_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(UTC))
-    updated_at = Column(DateTime, default=datetime.now(UTC), onupdate=datetime.now(UTC))
+    created_at = Column(DateTime, server_default=text("timezone('utc', now())"))
+    updated_at = Column(DateTime, server_default=text("timezone('utc', now())"), onupdate=utc_now())
 
     def to_dict(self):
         return {
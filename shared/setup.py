@@ -6,12 +6,13 @@ setup(
     packages=find_packages(),
     py_modules=["config"],
     install_requires=[
-        "sqlalchemy",
+        "sqlalchemy>=2.0",
         "psycopg2-binary",
-        "pgvector",
+        "pgvector>=0.3.0",
         "python-dotenv",
         "bcrypt",
-        "python-jose[cryptography]",
+        "PyJWT>=2.8",
         "passlib",
+        "redis",
     ],
 )
@@ -1,27 +1,33 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+import jwt
 from typing import Optional
 from datetime import datetime, timedelta, UTC
 from uuid import UUID
+import base64
+import hashlib
+import hmac
+import json
 import os
-from dotenv import load_dotenv
+import time
+from shared.config import load_env
 
 from shared.db.models.user import User, UserRole
 from shared.db.controllers.user_controller import UserRepository
 
-load_dotenv()
+load_env()
 
 security = HTTPBearer()
 SECRET_KEY = os.getenv("SECRET_KEY")
+_SECRET_BYTES = SECRET_KEY.encode("utf-8") if SECRET_KEY else None
+TOKEN_LIFETIME = timedelta(days=7)
 
 
 def sign_token(data: dict) -> Optional[str]:
     if not SECRET_KEY:
         return None
-    to_encode = data.copy()
-    to_encode.update({"exp": datetime.now(UTC) + timedelta(days=7)})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm='HS256')
+    to_encode = {**data, "exp": datetime.now(UTC) + TOKEN_LIFETIME}
+    return jwt.encode(to_encode, _SECRET_BYTES, algorithm='HS256')
 
 
 class TokenData:
@@ -32,20 +38,54 @@ class TokenData:
         self.username = username
 
 
-def verify_token(token: str) -> Optional[TokenData]:
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _verify_hs256(token: str) -> Optional[dict]:
+    """Claims of an HS256 token signed with SECRET_KEY that is currently valid, else None.
+
+    Tokens are only ever issued by sign_token, so this checks exactly what
+    jwt.decode(..., algorithms=['HS256']) would for them, without the generic
+    decoder's algorithm lookup and option handling on every request.
+    """
     try:
-        if not SECRET_KEY:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        if not header_segment or not payload_segment or "." in payload_segment:
             return None
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        user_id: str = payload.get("user_id")
-        role: str = payload.get("role")
-        email: str | None = payload.get("email")
-        username: str | None = payload.get("username")
-        if user_id is None:
+        expected = hmac.new(_SECRET_BYTES, signing_input.encode("ascii"), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
             return None
-        return TokenData(user_id=user_id, role=role, email=email, username=username)
-    except JWTError:
+        header = json.loads(_b64url_decode(header_segment))
+        payload = json.loads(_b64url_decode(payload_segment))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(header, dict) or header.get("alg") != "HS256" or not isinstance(payload, dict):
+        return None
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None and (not isinstance(exp, (int, float)) or exp <= now):
+        return None
+    nbf = payload.get("nbf")
+    if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > now):
+        return None
+    return payload
+
+
+def verify_token(token: str) -> Optional[TokenData]:
+    if not SECRET_KEY:
+        return None
+    payload = _verify_hs256(token)
+    if payload is None:
+        return None
+    user_id: str = payload.get("user_id")
+    role: str = payload.get("role")
+    email: str | None = payload.get("email")
+    username: str | None = payload.get("username")
+    if user_id is None:
         return None
+    return TokenData(user_id=user_id, role=role, email=email, username=username)
 
 
 async def get_current_user(
@@ -0,0 +1,171 @@
+import inspect
+import json
+import logging
+import uuid
+from datetime import datetime
+from functools import wraps
+from typing import Any, Optional
+
+import redis
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import UUID
+
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "mist:cache"
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    return _client
+
+
+def cache_key(namespace: str, scope: Any = None) -> str:
+    if scope is None:
+        return f"{KEY_PREFIX}:{namespace}"
+    return f"{KEY_PREFIX}:{namespace}:{scope}"
+
+
+def invalidate(namespace: str, scope: Any = None) -> None:
+    invalidate_key(cache_key(namespace, scope))
+
+
+def invalidate_key(key: str) -> None:
+    try:
+        get_redis().delete(key)
+    except redis.RedisError as e:
+        logger.warning("Cache invalidation failed for %s: %s", key, e)
+
+
+def _json_default(value: Any) -> Any:
+    # to_dict output carries raw datetimes and UUIDs; store them as the
+    # strings the API layer would have rendered anyway.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def get_json(key: str) -> Any:
+    try:
+        raw = get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning("Cache read failed for %s: %s", key, e)
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+def set_json(key: str, value: Any, ttl: int) -> None:
+    try:
+        get_redis().set(key, json.dumps(value, default=_json_default), ex=ttl)
+    except redis.RedisError as e:
+        logger.warning("Cache write failed for %s: %s", key, e)
+
+
+# INCRBYFLOAT would create a missing key from zero; only adjust a value that
+# was seeded from the database so a miss still falls through to it.
+_INCR_EXISTING = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBYFLOAT', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+def incr_float(key: str, amount: float) -> None:
+    """Add ``amount`` to a cached number, keeping its TTL; misses are left alone."""
+    try:
+        get_redis().eval(_INCR_EXISTING, 1, key, amount)
+    except redis.RedisError as e:
+        logger.warning("Cache increment failed for %s: %s", key, e)
+        invalidate_key(key)
+
+
+def model_to_cache(obj) -> dict:
+    """Column values of an ORM instance as a JSON-safe dict."""
+    data = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        data[column.key] = value
+    return data
+
+
+def model_from_cache(model, data: dict):
+    """Rebuild a detached instance of ``model`` from :func:`model_to_cache` output."""
+    values = dict(data)
+    for column in model.__table__.columns:
+        value = values.get(column.key)
+        if value is None:
+            continue
+        if isinstance(column.type, DateTime):
+            values[column.key] = datetime.fromisoformat(value)
+        elif isinstance(column.type, UUID):
+            values[column.key] = uuid.UUID(value)
+    return model(**values)
+
+
+def cached(namespace: str, ttl: int, scoped: bool = False):
+    """Cache a JSON-serialisable result in a Redis hash.
+
+    With ``scoped=True`` the function's first parameter selects the hash,
+    whether it is passed positionally or by keyword, so
+    ``invalidate(namespace, scope)`` drops every cached variant for it. The
+    hash expires ``ttl`` seconds after its first entry is written. Redis
+    errors fall through to the wrapped function.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        scope_param = next(iter(signature.parameters), None)
+        if scoped and scope_param is None:
+            raise TypeError(f"scoped cache {namespace!r} needs a function with a scope parameter")
+
+        def cache_slot(args, kwargs):
+            if not scoped:
+                field_kwargs = {k: v for k, v in kwargs.items() if k != "session"}
+                return cache_key(namespace), json.dumps([args, field_kwargs], default=str, sort_keys=True)
+            # Bind so positional and keyword calls land on the same hash and field.
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            scope = arguments.pop(scope_param)
+            arguments.pop("session", None)
+            return cache_key(namespace, scope), json.dumps(arguments, default=str, sort_keys=True)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key, field = cache_slot(args, kwargs)
+
+            try:
+                hit = get_redis().hget(key, field)
+                if hit is not None:
+                    return json.loads(hit)
+            except redis.RedisError as e:
+                logger.warning("Cache read failed for %s: %s", namespace, e)
+
+            result = func(*args, **kwargs)
+
+            try:
+                pipe = get_redis().pipeline()
+                pipe.hset(key, field, json.dumps(result, default=_json_default))
+                pipe.expire(key, ttl, nx=True)
+                pipe.execute()
+            except (redis.RedisError, TypeError) as e:
+                logger.warning("Cache write failed for %s: %s", namespace, e)
+            return result
+        return wrapper
+    return decorator
@@ -1,12 +1,31 @@
+import hashlib
+import hmac
 import os
+import secrets
+import threading
+import time
+from typing import Dict
+
 import bcrypt
-from dotenv import load_dotenv
+from shared.config import load_env
+
+load_env()
 
-load_dotenv()
+# bcrypt embeds the cost in each hash, so changing this only affects new hashes.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Recent successful verifications, so a burst of logins with the same
+# credentials pays for bcrypt once. Keys are HMACs under a per-process random
+# key: the cache never holds anything that can be brute-forced offline.
+VERIFY_CACHE_TTL = 300.0
+VERIFY_CACHE_MAX_SIZE = 10_000
+_verify_cache_key = secrets.token_bytes(32)
+_verified: Dict[bytes, float] = {}
+_verified_lock = threading.Lock()
 
 
 def generate_hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -14,4 +33,18 @@ def generate_hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     if not hashed_password:
         return False
-    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+    password_bytes = password.encode("utf-8")
+    hash_bytes = hashed_password.encode("utf-8")
+    cache_key = hmac.new(_verify_cache_key, hash_bytes + b"\0" + password_bytes, hashlib.sha256).digest()
+    now = time.monotonic()
+    expires_at = _verified.get(cache_key)
+    if expires_at is not None and expires_at > now:
+        return True
+    # Only successes are cached; a wrong password always pays the full cost.
+    if not bcrypt.checkpw(password_bytes, hash_bytes):
+        return False
+    with _verified_lock:
+        if len(_verified) >= VERIFY_CACHE_MAX_SIZE:
+            _verified.pop(next(iter(_verified)))
+        _verified[cache_key] = now + VERIFY_CACHE_TTL
+    return True
@@ -1,9 +1,9 @@
 from celery import Celery
 import os
 import sys
-from dotenv import load_dotenv
+from shared.config import load_env
 
-load_dotenv()
+load_env()
 
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
@@ -4,10 +4,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from dotenv import load_dotenv
+from shared.config import load_env
 import os
 
-load_dotenv()
+load_env()
 
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
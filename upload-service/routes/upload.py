@@ -41,7 +41,7 @@ class UploadComplete(BaseModel):
 
 @router.post('/request')
 @limiter.limit("5/minute")
-async def file_upload_request(request: Request, upload_req: UploadRequest):
+def file_upload_request(request: Request, upload_req: UploadRequest):
     _require_auth(request)
     try:
         job_id = ProcessingJobRepository.create(metadata=upload_req.metadata)
@@ -67,7 +67,7 @@ async def file_upload_request(request: Request, upload_req: UploadRequest):
 
 @router.post('/complete')
 @limiter.limit("5/minute")
-async def file_upload_complete(request: Request, req: UploadComplete):
+def file_upload_complete(request: Request, req: UploadComplete):
     _require_auth(request)
     try:
         job = ProcessingJobRepository.get_by_job_id(req.jobId)
@@ -95,7 +95,7 @@ async def file_upload_complete(request: Request, req: UploadComplete):
 
 
 @router.get('/job/{job_id}')
-async def get_job_status(job_id: str, request: Request):
+def get_job_status(job_id: str, request: Request):
     _require_auth(request)
     try:
         job = ProcessingJobRepository.get_by_job_id(job_id)
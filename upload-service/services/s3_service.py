@@ -1,10 +1,17 @@
+import base64
+import hashlib
+import hmac
+import json
 import boto3
 import os
 import logging
+from datetime import datetime, timedelta, UTC
+from functools import lru_cache
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from dotenv import load_dotenv
+from shared.config import load_env
 
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
@@ -17,30 +24,91 @@ if not S3_BUCKET_NAME:
     raise ValueError("S3_BUCKET_NAME not set")
 
 
+@lru_cache(maxsize=1)
 def _get_s3_client():
+    # Clients are thread-safe; building one resolves endpoints and credentials,
+    # so every call shares this one and its keep-alive connection pool.
     return boto3.client(
         's3',
         aws_access_key_id=AWS_ACCESS_KEY_ID,
         aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
+        region_name=AWS_REGION,
+        config=Config(max_pool_connections=50, retries={'max_attempts': 3, 'mode': 'adaptive'}),
     )
 
 
+MAX_UPLOAD_BYTES = 52428800
+
+# Where browsers POST uploads. generate_presigned_post resolves it through the
+# endpoint ruleset on every call, so it is taken from the first response and
+# later policies are signed locally.
+_post_url = None
+
+
+@lru_cache(maxsize=1)
+def _credentials():
+    return boto3.Session(
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name=AWS_REGION,
+    ).get_credentials()
+
+
+@lru_cache(maxsize=4)
+def _signing_key(secret_key: str, datestamp: str) -> bytes:
+    key = ('AWS4' + secret_key).encode('utf-8')
+    for part in (datestamp, AWS_REGION, 's3', 'aws4_request'):
+        key = hmac.new(key, part.encode('utf-8'), hashlib.sha256).digest()
+    return key
+
+
+def _sign_post_policy(s3_key: str, fields: dict, conditions: list, expires_in: int) -> dict:
+    """SigV4 POST policy, as generate_presigned_post builds it."""
+    credentials = _credentials().get_frozen_credentials()
+    now = datetime.now(UTC)
+    datestamp = now.strftime('%Y%m%d')
+    fields = {
+        **fields,
+        'key': s3_key,
+        'x-amz-algorithm': 'AWS4-HMAC-SHA256',
+        'x-amz-credential': f"{credentials.access_key}/{datestamp}/{AWS_REGION}/s3/aws4_request",
+        'x-amz-date': now.strftime('%Y%m%dT%H%M%SZ'),
+    }
+    if credentials.token:
+        fields['x-amz-security-token'] = credentials.token
+    policy = {
+        'expiration': (now + timedelta(seconds=expires_in)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'conditions': conditions + [{'bucket': S3_BUCKET_NAME}] + [
+            {name: fields[name]} for name in fields if name != 'Content-Type'
+        ],
+    }
+    fields['policy'] = base64.b64encode(json.dumps(policy).encode('utf-8')).decode('ascii')
+    fields['x-amz-signature'] = hmac.new(
+        _signing_key(credentials.secret_key, datestamp), fields['policy'].encode('ascii'), hashlib.sha256
+    ).hexdigest()
+    return fields
+
+
 def generate_presigned_upload_url(filename: str, content_type: str, job_id: str, expires_in: int = 900) -> dict:
+    global _post_url
     try:
-        s3_client = _get_s3_client()
         s3_key = f"audio/original/{job_id}/{filename}"
-        response = s3_client.generate_presigned_post(
-            Bucket=S3_BUCKET_NAME,
-            Key=s3_key,
-            Fields={'Content-Type': content_type},
-            Conditions=[
-                {'Content-Type': content_type},
-                ['content-length-range', 1, 52428800],
-            ],
-            ExpiresIn=expires_in
-        )
-        return {'url': response['url'], 'fields': response['fields'], 's3_key': s3_key}
+        fields = {'Content-Type': content_type}
+        conditions = [
+            {'Content-Type': content_type},
+            ['content-length-range', 1, MAX_UPLOAD_BYTES],
+        ]
+        if _post_url is None:
+            response = _get_s3_client().generate_presigned_post(
+                Bucket=S3_BUCKET_NAME,
+                Key=s3_key,
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=expires_in
+            )
+            _post_url = response['url']
+            return {'url': response['url'], 'fields': response['fields'], 's3_key': s3_key}
+        return {'url': _post_url, 'fields': _sign_post_policy(s3_key, fields, conditions, expires_in), 's3_key': s3_key}
     except ClientError as e:
         logger.error(f"Error generating presigned URL: {e}")
         raise